@@ -0,0 +1,149 @@
+"""Micro-benchmark: LVT API message encoding / decoding.
+
+Compares the original stdlib json double encoding ("Data" as JSON string
+inside JSON envelope) with lvt_codec backend in legacy and compact framing.
+
+Usage:
+    python benchmarks/bench_codec.py [--terminals 40] [--intents 200] [--number 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "custom-components", "lvt")
+)
+
+import lvt_codec  # noqa: E402
+
+
+def server_status(terminals: int) -> dict:
+    """ServerStatus message payload"""
+    return {
+        "Terminals": {
+            f"speaker{i}": {
+                "Id": f"speaker{i}",
+                "Name": f"Колонка в комнате {i}",
+                "Location": f"Комната {i}",
+                "Version": "0.9.4",
+                "Address": f"192.168.1.{i % 250 + 1}",
+                "Connected": bool(i % 5),
+                "Volume": 50 + i % 50,
+                "Filter": i % 4,
+                "IsActive": False,
+                "Dialog": None,
+            }
+            for i in range(terminals)
+        }
+    }
+
+
+def set_intents(intents: int) -> list:
+    """SetIntents message payload"""
+    return [
+        {
+            "Intent": f"Intent{i}",
+            "Terminals": [],
+            "Utterance": [
+                f"action=[on=включи,off=выключи] свет номер {i} в location=<Locations>",
+                f"сделай color=[00FF00=зеленый,0000FF=синий] свет {i}",
+            ],
+        }
+        for i in range(intents)
+    ]
+
+
+def stdlib_encode(message: dict) -> str:
+    return json.dumps({**message, "Data": json.dumps(message["Data"])})
+
+
+def stdlib_decode(frame: str) -> dict:
+    request = json.loads(frame)
+    request["Data"] = json.loads(request["Data"])
+    return request
+
+
+def codec_encode_legacy(message: dict) -> str:
+    return lvt_codec.json_dumps(
+        {**message, "Data": lvt_codec.json_dumps(message["Data"])}
+    )
+
+
+def codec_decode_legacy(frame: str) -> dict:
+    request = lvt_codec.json_loads(frame)
+    request["Data"] = lvt_codec.json_loads(request["Data"])
+    return request
+
+
+def codec_encode_compact(message: dict) -> str:
+    return lvt_codec.json_dumps(message)
+
+
+def codec_decode_compact(frame: str) -> dict:
+    return lvt_codec.json_loads(frame)
+
+
+def bench(name: str, message: dict, number: int) -> None:
+    legacy_frame = stdlib_encode(message)
+    compact_frame = codec_encode_compact(message)
+    cases = [
+        ("stdlib json, legacy", stdlib_encode, stdlib_decode, legacy_frame),
+        (
+            f"{lvt_codec.JSON_BACKEND}, legacy",
+            codec_encode_legacy,
+            codec_decode_legacy,
+            codec_encode_legacy(message),
+        ),
+        (
+            f"{lvt_codec.JSON_BACKEND}, compact",
+            codec_encode_compact,
+            codec_decode_compact,
+            compact_frame,
+        ),
+    ]
+    print(
+        f"\n{name}: legacy frame {len(legacy_frame.encode())} bytes, "
+        f"compact frame {len(compact_frame.encode())} bytes"
+    )
+    print(f"{'case':<24}{'encode, us':>12}{'decode, us':>12}")
+    baseline = None
+    for case, encode, decode, frame in cases:
+        t_enc = timeit.timeit(lambda: encode(message), number=number) / number
+        t_dec = timeit.timeit(lambda: decode(frame), number=number) / number
+        if baseline is None:
+            baseline = t_enc + t_dec
+        print(
+            f"{case:<24}{t_enc * 1e6:>12.1f}{t_dec * 1e6:>12.1f}"
+            f"   x{baseline / (t_enc + t_dec):.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terminals", type=int, default=40)
+    parser.add_argument("--intents", type=int, default=200)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {lvt_codec.JSON_BACKEND}")
+    bench(
+        f"ServerStatus, {args.terminals} terminals",
+        {
+            "Message": "ServerStatus",
+            "StatusCode": 0,
+            "Data": server_status(args.terminals),
+        },
+        args.number,
+    )
+    bench(
+        f"SetIntents, {args.intents} intents",
+        {"Message": "SetIntents", "StatusCode": 0, "Data": set_intents(args.intents)},
+        args.number,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""End-to-end load benchmark: LvtApi against local stand-in LVT server.
+
+Stand-in server runs in a separate process and speaks LVT API protocol:
+it authorizes the client, reports terminals with ServerStatus, sends
+terminal Status updates and fires intents with FireIntent at configured
+rates. Home Assistant side runs the real LvtHub / LvtApi on a bare
+HomeAssistant core, handles intents with an intent handler replying with
+speech (sent back to the server as Say) and queues Say announcements.
+
+Reported:
+* FireIntent -> Say round-trip (server clock)
+* Outbound latency: send_message() call -> message received by server
+* HA process CPU time per message sent or received
+* HA process memory growth
+* LvtApi metrics as reported by LVT metric sensors
+* Spans of the slowest intent trace kept by LvtApi
+
+Requires Home Assistant installed (as in HA development environment).
+
+Usage:
+    python benchmarks/bench_e2e.py [--terminals 40] [--intent-rate 20]
+        [--announce-rate 20] [--status-rate 10] [--duration 30]
+        [--protocols Compact,Zlib] [--tracemalloc] [--capture FILE]
+
+--capture records the session to be replayed with replay_capture.py
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import resource
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom-components"))
+
+from aiohttp import WSMsgType, web  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant.helpers import area_registry, device_registry  # noqa: E402
+from homeassistant.helpers import entity_registry, intent  # noqa: E402
+
+from lvt.const import LVT_PLATFORMS, MSG_API_SAY  # noqa: E402
+from lvt.lvt import LvtApi, decode_message, encode_message  # noqa: E402
+from lvt.lvt_hub import LvtHub  # noqa: E402
+
+BENCH_INTENT = "LvtBenchIntent"
+BENCH_PASSWORD = "bench"
+# Time (seconds) allowed to connect and authorize
+CONNECT_TIMEOUT = 30
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile (NaN if no values)"""
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def terminal_info(i: int, volume: int = 50) -> dict:
+    return {
+        "Id": f"bench{i}",
+        "Name": f"Bench terminal {i}",
+        "Location": f"Room {i}",
+        "Version": "bench",
+        "Address": f"10.0.{i // 250}.{i % 250 + 1}",
+        "Connected": True,
+        "Volume": volume,
+        "Filter": 0,
+    }
+
+
+# region stand-in LVT server (separate process) ##############################
+class StandInServer:
+    """Minimal LVT server: single client, fixed rates"""
+
+    def __init__(self, args, stop_at: float) -> None:
+        self.args = args
+        self.stop_at = stop_at
+        self.accepted = [p for p in args.protocols.split(",") if p]
+        self.protocols = ()
+        self.fired = {}
+        self.round_trips = []
+        self.outbound = []
+        self.received = {}
+        self.sent = 0
+
+    async def send(self, ws, message: dict, protocols=None):
+        frame = encode_message(
+            message, self.protocols if protocols is None else protocols
+        )
+        if isinstance(frame, bytes):
+            await ws.send_bytes(frame)
+        else:
+            await ws.send_str(frame)
+        self.sent += 1
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        tasks = []
+        try:
+            async for msg in ws:
+                if msg.type not in (WSMsgType.TEXT, WSMsgType.BINARY):
+                    break
+                now = time.time()
+                message = decode_message(msg.data, self.protocols)
+                name = message["Message"]
+                self.received[name] = self.received.get(name, 0) + 1
+                data = message.get("Data")
+                if name == "Authorize":
+                    # Reply is encoded before protocol extensions are enabled
+                    await self.send(
+                        ws,
+                        {
+                            "Message": "Authorize",
+                            "StatusCode": 0 if data == BENCH_PASSWORD else 1,
+                            "Protocols": self.accepted,
+                            "Data": None,
+                        },
+                        (),
+                    )
+                    self.protocols = tuple(self.accepted)
+                    await self.send(
+                        ws,
+                        {
+                            "Message": "ServerStatus",
+                            "Data": {
+                                "Terminals": {
+                                    f"bench{i}": terminal_info(i)
+                                    for i in range(self.args.terminals)
+                                }
+                            },
+                        },
+                    )
+                    tasks = [
+                        asyncio.create_task(self.fire_intents(ws)),
+                        asyncio.create_task(self.update_status(ws)),
+                    ]
+                elif name == "Say" and isinstance(data, dict):
+                    text = str(data.get("Say"))
+                    if text.startswith("bench "):
+                        sent = self.fired.pop(int(text[6:]), None)
+                        if sent is not None:
+                            self.round_trips.append(now - sent)
+                    if "BenchSent" in data:
+                        self.outbound.append(now - float(data["BenchSent"]))
+        finally:
+            for task in tasks:
+                task.cancel()
+        return ws
+
+    async def paced(self, rate: float):
+        """Yield sequence numbers at given rate until benchmark ends"""
+        if rate <= 0:
+            return
+        started = time.time()
+        n = 0
+        while time.time() < self.stop_at:
+            yield n
+            n += 1
+            await asyncio.sleep(max(0, started + n / rate - time.time()))
+
+    async def fire_intents(self, ws):
+        async for n in self.paced(self.args.intent_rate):
+            self.fired[n] = time.time()
+            await self.send(
+                ws,
+                {
+                    "Message": "FireIntent",
+                    "Data": {
+                        "Intent": BENCH_INTENT,
+                        "Terminal": f"bench{n % self.args.terminals}",
+                        "Data": {"BenchId": n, "text": "бенчмарк"},
+                    },
+                },
+            )
+
+    async def update_status(self, ws):
+        async for n in self.paced(self.args.status_rate):
+            i = n % self.args.terminals
+            await self.send(
+                ws,
+                {
+                    "Message": "Status",
+                    "Data": {f"bench{i}": terminal_info(i, n % 10 * 10)},
+                },
+            )
+
+    async def run(self, port: int, conn):
+        app = web.Application()
+        app.router.add_get("/api", self.handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        conn.send("ready")
+        # Wait for HA side to finish
+        await asyncio.get_running_loop().run_in_executor(None, conn.recv)
+        await runner.cleanup()
+        conn.send(
+            {
+                "round_trips": self.round_trips,
+                "outbound": self.outbound,
+                "unanswered": len(self.fired),
+                "received": self.received,
+                "sent": self.sent,
+            }
+        )
+
+
+def run_server(args, port: int, stop_at: float, conn):
+    asyncio.run(StandInServer(args, stop_at).run(port, conn))
+
+
+# endregion
+
+
+# region Home Assistant side ##################################################
+class BenchIntentHandler(intent.IntentHandler):
+    """Reply with speech identifying fired intent"""
+
+    intent_type = BENCH_INTENT
+
+    async def async_handle(self, intent_obj: intent.Intent):
+        response = intent_obj.create_response()
+        response.async_set_speech(f"bench {intent_obj.slots['BenchId']['value']}")
+        return response
+
+
+async def create_hass(config_dir: str) -> HomeAssistant:
+    """Bare HomeAssistant core with registries loaded"""
+    try:
+        hass = HomeAssistant(config_dir)
+    except TypeError:  # HA before 2023.11
+        hass = HomeAssistant()
+        hass.config.config_dir = config_dir
+    await area_registry.async_load(hass)
+    await device_registry.async_load(hass)
+    await entity_registry.async_load(hass)
+    return hass
+
+
+async def announce(api: LvtApi, args, stop_at: float):
+    """Queue Say announcements at given rate"""
+    if args.announce_rate <= 0:
+        return
+    started = time.time()
+    n = 0
+    while time.time() < stop_at:
+        api.send_message(
+            MSG_API_SAY,
+            data={
+                "Say": f"announcement {n}",
+                "Terminals": [f"bench{n % args.terminals}"],
+                "Importance": 2,
+                "BenchSent": time.time(),
+            },
+        )
+        n += 1
+        await asyncio.sleep(max(0, started + n / args.announce_rate - time.time()))
+
+
+async def run_hass(args, port: int, stop_at: float) -> dict:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await create_hass(config_dir)
+        intent.async_register(hass, BenchIntentHandler())
+        hub = LvtHub(hass)
+        hub.parse_intents(
+            {"intents": [{"intent": BENCH_INTENT, "utterance": ["бенчмарк"]}]}
+        )
+        api = LvtApi(hass, hub, "bench")
+        hub.add_api("bench", api)
+        # As if metric sensors are enabled
+        api.metrics.subscribe()
+        entities = []
+        for platform in LVT_PLATFORMS:
+            api.platform_loaded(platform, entities.extend)
+
+        if args.capture:
+            api.configure_capture(os.path.abspath(args.capture), 1 << 30)
+        api.configure_connection("127.0.0.1", port, BENCH_PASSWORD, 0)
+        deadline = time.time() + CONNECT_TIMEOUT
+        while not api.authorized:
+            if time.time() > deadline:
+                raise TimeoutError("LvtApi is not authorized by stand-in server")
+            await asyncio.sleep(0.05)
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        traced = tracemalloc.get_traced_memory()[0] if args.tracemalloc else 0
+        cpu = time.process_time()
+        await announce(api, args, stop_at)
+        await asyncio.sleep(max(0, stop_at - time.time()) + 1)
+        cpu = time.process_time() - cpu
+
+        result = {
+            "cpu": cpu,
+            "rss_growth": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss,
+            "traced_growth": tracemalloc.get_traced_memory()[0] - traced
+            if args.tracemalloc
+            else None,
+            "entities": len(entities),
+            "dispatcher": api.intent_dispatcher.stats,
+            "metrics": {
+                name: getattr(api.metrics, name).as_dict()
+                for name in (
+                    "send_latency",
+                    "intent_reply_latency",
+                    "intent_handler_duration",
+                )
+            },
+            "auth_time": api.metrics.auth_time,
+            "traces": api.tracer.export(),
+        }
+        hub.unload()
+        # Let capture be written
+        await hass.async_block_till_done()
+        await hass.async_stop(force=True)
+        return result
+
+
+# endregion
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terminals", type=int, default=40)
+    parser.add_argument("--intent-rate", type=float, default=20, help="per second")
+    parser.add_argument("--announce-rate", type=float, default=20, help="per second")
+    parser.add_argument("--status-rate", type=float, default=10, help="per second")
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--protocols",
+        default="Compact,Zlib",
+        help="protocol extensions accepted by stand-in server",
+    )
+    parser.add_argument("--tracemalloc", action="store_true")
+    parser.add_argument("--capture", help="capture websocket frames to file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    port = free_port()
+    conn, server_conn = multiprocessing.Pipe()
+    # Rates are applied once client is connected: give it time to connect
+    stop_at = time.time() + args.duration + 5
+    server = multiprocessing.Process(
+        target=run_server, args=(args, port, stop_at, server_conn), daemon=True
+    )
+    server.start()
+    conn.recv()
+    try:
+        ha = asyncio.run(run_hass(args, port, stop_at))
+    finally:
+        conn.send("stop")
+    stats = conn.recv()
+    server.join()
+
+    messages = stats["sent"] + sum(stats["received"].values())
+    print(
+        f"{args.terminals} terminals, {args.intent_rate}/s intents, "
+        f"{args.announce_rate}/s announcements, {args.status_rate}/s status updates, "
+        f"protocols: {args.protocols or '-'}"
+    )
+    print(f"Messages: {stats['sent']} received by HA, {stats['received']} sent by HA")
+    for name, values in (
+        ("FireIntent -> Say", stats["round_trips"]),
+        ("Outbound latency", stats["outbound"]),
+    ):
+        print(
+            f"{name:<20} n={len(values):<6} "
+            f"p50={percentile(values, 50) * 1000:8.2f} ms  "
+            f"p99={percentile(values, 99) * 1000:8.2f} ms"
+        )
+    print(f"Intents not answered: {stats['unanswered']}")
+    print(f"Intent dispatcher: {ha['dispatcher']}")
+    for name, summary in ha["metrics"].items():
+        print(
+            f"LvtApi {name:<24} n={summary['count']:<6} "
+            f"p50<={summary['p50_ms']} ms  p99<={summary['p99_ms']} ms"
+        )
+    print(f"LvtApi auth time: {ha['auth_time'] * 1000:.2f} ms")
+    if ha["traces"]:
+        trace_id, trace = max(
+            ha["traces"].items(), key=lambda item: item[1]["duration_ms"]
+        )
+        print(f"Slowest of {len(ha['traces'])} traces kept: {trace_id}")
+        for span in trace["spans"]:
+            print(
+                f"    +{(span['start'] - trace['start']) * 1000:8.3f} ms "
+                f"{span['name']:<16} {span['duration_ms']:8.3f} ms"
+            )
+    print(f"Entities created: {ha['entities']}")
+    print(f"CPU: {ha['cpu'] / max(1, messages) * 1e6:.1f} us per message")
+    print(f"Max RSS growth: {ha['rss_growth']} KiB")
+    if ha["traced_growth"] is not None:
+        print(f"Traced memory growth: {ha['traced_growth'] / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
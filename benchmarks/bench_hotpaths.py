@@ -0,0 +1,482 @@
+"""Micro-benchmarks: LvtApi hot paths against lightweight fake hass.
+
+Covered:
+* parse_speakers with 10/100/1000 terminals and mixed kinds of ids
+* receive loop frame decoding (legacy and compact framing)
+* trigger dispatch with many registered triggers
+* synchronize_speakers
+* handle_negotiate option parsing
+* LvtSpeaker.async_update (unchanged and changed terminal status)
+
+Fake hass provides event loop, bus, services and in-memory device and
+entity registries only, so results show cost of integration code itself.
+
+Per-call cost is divided by cost of a fixed pure Python calibration loop:
+baselines saved on one machine remain usable on another one.
+
+Usage:
+    python benchmarks/bench_hotpaths.py [--save] [--compare] [--tolerance 1.5]
+        [--baseline benchmarks/baseline_hotpaths.json] [--filter parse_speakers]
+
+--save stores results as baseline, --compare fails (exit code 1) if any
+benchmark is slower than baseline by more than --tolerance times.
+Requires Home Assistant installed (as in HA development environment).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom-components"))
+
+# Import HA components in the order HA loads them (avoids circular imports)
+import homeassistant.bootstrap  # noqa: E402,F401
+from homeassistant.const import __version__ as HA_VERSION  # noqa: E402
+from homeassistant.core import CoreState, HassJob  # noqa: E402
+
+from lvt.const import (  # noqa: E402
+    DOMAIN,
+    LVT_PLATFORMS,
+    lvt_entity_id,
+    lvt_speaker_device_id,
+    lvt_unique_id,
+)
+import lvt.lvt  # noqa: E402
+from lvt.lvt import LvtApi, decode_message, encode_message  # noqa: E402
+from lvt.lvt_hub import LvtHub  # noqa: E402
+from lvt.lvt_outbox import LvtOutbox  # noqa: E402
+from lvt.number import LvtVolumeEntity  # noqa: E402
+from lvt.select import LvtFilterEntity  # noqa: E402
+from lvt.trigger import compile_data_filter, compile_speaker_filter  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline_hotpaths.json")
+# Minimal total time (seconds) each benchmark runs
+MIN_TIME = 0.2
+# Number of runs, the fastest one is reported
+REPEAT = 7
+
+
+# region fake hass ############################################################
+class FakeBus:
+    """Event bus: listeners are registered but events are never fired"""
+
+    def async_listen(self, event_type, listener, event_filter=None):
+        return lambda: None
+
+    def async_listen_once(self, event_type, listener):
+        return lambda: None
+
+    def async_fire(self, event_type, event_data=None, *args, **kwargs):
+        pass
+
+
+class FakeServices:
+    def __init__(self) -> None:
+        self.services = {}
+
+    def async_register(self, domain, service, handler, *args, **kwargs):
+        self.services[(domain, service)] = handler
+
+    def async_remove(self, domain, service):
+        self.services.pop((domain, service), None)
+
+
+class FakeEntityRegistry:
+    def __init__(self) -> None:
+        self.entities = {}
+        self.__ids = {}
+
+    def add(self, platform, unique_id, entity_id, device_id):
+        self.entities[entity_id] = SimpleNamespace(
+            entity_id=entity_id,
+            unique_id=unique_id,
+            platform=DOMAIN,
+            device_id=device_id,
+            disabled_by=None,
+            disabled=False,
+        )
+        self.__ids[(platform, unique_id)] = entity_id
+
+    def async_get_entity_id(self, domain, platform, unique_id):
+        return self.__ids.get((domain, unique_id))
+
+    def async_get(self, entity_id):
+        return self.entities.get(entity_id)
+
+
+class FakeDeviceRegistry:
+    def __init__(self) -> None:
+        self.devices = {}
+        self.__ids = {}
+
+    def add(self, device_id, identifier, area_id):
+        identifiers = {(DOMAIN, identifier)}
+        self.devices[device_id] = SimpleNamespace(
+            id=device_id,
+            area_id=area_id,
+            identifiers=identifiers,
+            config_entries=set(),
+            disabled=False,
+        )
+        self.__ids[(DOMAIN, identifier)] = device_id
+
+    def async_get_device(self, identifiers, connections=None):
+        for identifier in identifiers:
+            if identifier in self.__ids:
+                return self.devices[self.__ids[identifier]]
+        return None
+
+    def async_update_device(self, device_id, **kwargs):
+        return self.devices[device_id]
+
+    def async_remove_device(self, device_id):
+        self.devices.pop(device_id, None)
+
+
+class FakeHass:
+    """Just enough of HomeAssistant for LvtHub / LvtApi / LvtSpeaker"""
+
+    def __init__(self, config_dir: str) -> None:
+        self.loop = asyncio.get_running_loop()
+        self.bus = FakeBus()
+        self.services = FakeServices()
+        self.state = CoreState.running
+        self.config = SimpleNamespace(
+            config_dir=config_dir,
+            path=lambda *path: os.path.join(config_dir, *path),
+        )
+        self.data = {
+            "device_registry": FakeDeviceRegistry(),
+            "entity_registry": FakeEntityRegistry(),
+        }
+        self.jobs = 0
+
+    def async_create_task(self, target, *args, **kwargs):
+        return self.loop.create_task(target)
+
+    def async_run_hass_job(self, job: HassJob, *args):
+        self.jobs += 1
+
+    def async_add_executor_job(self, target, *args):
+        return self.loop.run_in_executor(None, target, *args)
+
+
+# endregion
+
+
+# region fixtures #############################################################
+class BenchOutbox(LvtOutbox):
+    """Outbound queue nobody takes messages from: keep it from overflowing"""
+
+    def put(self, message: dict) -> bool:
+        if len(self) >= 128:
+            self.clear()
+        return super().put(message)
+
+
+lvt.lvt.LvtOutbox = BenchOutbox
+
+
+def terminal_info(i: int, volume: int = 50) -> dict:
+    return {
+        "Id": f"bench{i}",
+        "Name": f"Bench terminal {i}",
+        "Location": f"Room {i}",
+        "Version": "bench",
+        "Address": f"10.0.{i // 250}.{i % 250 + 1}",
+        "Connected": True,
+        "Volume": volume,
+        "Filter": 0,
+    }
+
+
+async def create_api(hass: FakeHass, terminals: int) -> LvtApi:
+    """LvtApi with registered speakers: devices in areas, volume/filter entities"""
+    hub = LvtHub(hass)
+    api = LvtApi(hass, hub, f"bench{terminals}")
+    hub.add_api(api.server_id, api)
+    for platform in LVT_PLATFORMS:
+        api.platform_loaded(platform, lambda entities: None)
+    devices = hass.data["device_registry"]
+    entities = hass.data["entity_registry"]
+    for i in range(terminals):
+        speaker_id = f"bench{i}"
+        device_id = f"device_{api.server_id}_{i}"
+        devices.add(
+            device_id, lvt_speaker_device_id(api.server_id, speaker_id), f"area{i % 10}"
+        )
+        for e_id, platform in (
+            ("online", "binary_sensor"),
+            ("volume", "number"),
+            ("filter", "select"),
+        ):
+            entities.add(
+                platform,
+                lvt_unique_id(speaker_id, e_id, api.server_id),
+                f"{platform}.{lvt_entity_id(speaker_id, e_id, api.server_id)}",
+                device_id,
+            )
+        await api._async_update_speaker_status(terminal_info(i))
+        speaker = api.speakers[speaker_id]
+        speaker.entities["volume"] = LvtVolumeEntity(hass, api, speaker)
+        speaker.entities["filter"] = LvtFilterEntity(hass, api, speaker)
+    return api
+
+
+def mixed_ids(terminals: int) -> list:
+    """10 speaker references of every kind accepted by parse_speakers"""
+    step = max(1, terminals // 10)
+    server_id = f"bench{terminals}"
+    kinds = [
+        lambda i: f"bench{i}",
+        lambda i: f"device_bench{terminals}_{i}",
+        lambda i: f"area{i % 10}",
+        lambda i: f"number.{lvt_entity_id(f'bench{i}', 'volume', server_id)}",
+        lambda i: lvt_unique_id(f"bench{i}", "filter", server_id),
+    ]
+    return [kinds[n % len(kinds)](n * step % terminals) for n in range(10)]
+
+
+# endregion
+
+
+# region benchmark runner #####################################################
+def calibrate() -> float:
+    """Cost (seconds) of the fixed pure Python workload"""
+    best = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        total = 0
+        for i in range(100000):
+            total += i % 7
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+async def measure(func, is_async: bool) -> float:
+    """Best per call time (seconds) of func()"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            if is_async:
+                await func()
+            else:
+                func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= MIN_TIME / REPEAT:
+            break
+        number *= 2
+    best = elapsed / number
+    for _ in range(REPEAT - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            if is_async:
+                await func()
+            else:
+                func()
+        best = min(best, (time.perf_counter() - started) / number)
+    return best
+
+
+async def benchmarks(hass: FakeHass):
+    """Yield (name, func, is_async)"""
+    for terminals in (10, 100, 1000):
+        api = await create_api(hass, terminals)
+        ids = mixed_ids(terminals)
+        yield (
+            f"parse_speakers[{terminals} terminals, 10 mixed ids]",
+            lambda api=api, ids=ids: api.parse_speakers(ids, False),
+            False,
+        )
+
+        def cold(api=api, ids=ids):
+            api._async_invalidate_speakers_index()
+            api.parse_speakers(ids, False)
+
+        yield (f"parse_speakers[{terminals} terminals, index rebuild]", cold, False)
+
+        unrelated = SimpleNamespace(
+            data={"action": "update", "entity_id": "light.unrelated"}
+        )
+
+        def registry_event(api=api, ids=ids):
+            if api._entity_event_concerns_speakers(unrelated):
+                api._async_registry_updated(unrelated)
+            api.parse_speakers(ids, False)
+
+        yield (
+            f"parse_speakers[{terminals} terminals, unrelated registry event]",
+            registry_event,
+            False,
+        )
+
+    status = {"Terminals": {f"bench{i}": terminal_info(i) for i in range(40)}}
+    fire_intent = {
+        "Intent": "Light",
+        "Terminal": "bench1",
+        "Data": {"action": "on", "location": "kitchen", "text": "включи свет"},
+    }
+    for protocols in ((), ("Compact",)):
+        framing = "compact" if protocols else "legacy"
+        for name, data in (
+            ("ServerStatus, 40 terminals", status),
+            ("FireIntent", fire_intent),
+        ):
+            frame = encode_message(
+                {"Message": name.split(",")[0], "StatusCode": 0, "Data": data},
+                protocols,
+            )
+            yield (
+                f"decode_message[{name}, {framing}]",
+                lambda frame=frame, protocols=protocols: decode_message(
+                    frame, protocols
+                ),
+                False,
+            )
+
+    api = await create_api(hass, 100)
+    hub = LvtHub(hass)
+    for n in range(1000):
+        config = {"intent": f"intent{n % 100}"}
+        if n % 3 == 1:
+            config["speaker"] = [f"bench{n % 100}", f"area{n % 10}"]
+        if n % 3 == 2:
+            config["data"] = {"action": ["on", "off"], "location": {"regex": "kitchen.*"}}
+        hub.add_trigger(
+            config,
+            lambda *args: None,
+            {"trigger_data": {"id": str(n)}},
+            compile_speaker_filter(config),
+            compile_data_filter(config),
+        )
+    speaker = api.speakers["bench7"]
+    yield (
+        "fire_triggers[1000 triggers, 10 per intent]",
+        lambda: hub.fire_triggers(
+            "intent7", {"action": "on", "location": "kitchen"}, "bench7", speaker
+        ),
+        False,
+    )
+
+    api = await create_api(hass, 40)
+    volume = [0]
+
+    def synchronize(api=api):
+        volume[0] = (volume[0] + 10) % 100
+        for speaker in api.speakers.values():
+            speaker.entities["volume"].set_native_value(volume[0])
+            api.async_speaker_changed(speaker)
+        api.synchronize_speakers()
+
+    yield ("synchronize_speakers[40 dirty speakers]", synchronize, False)
+
+    call = SimpleNamespace(
+        service="negotiate",
+        return_response=False,
+        data={
+            "speaker": ["bench1", "area2"],
+            "importance": 2,
+            "say": "Что включить?",
+            "prompt": "Повторите пожалуйста",
+            **{
+                f"option_{i}_{key}": f"{key} {i}"
+                for i in range(1, 6)
+                for key in ("intent", "utterance", "say")
+            },
+            "default_intent": "cancel",
+        },
+    )
+    yield ("handle_negotiate[5 options]", lambda: api.handle_negotiate(call), True)
+
+    speaker = api.speakers["bench3"]
+    unchanged = terminal_info(3)
+    yield (
+        "LvtSpeaker.async_update[unchanged]",
+        lambda: speaker.async_update(unchanged),
+        True,
+    )
+    changed = [terminal_info(3, 40), terminal_info(3, 60)]
+    toggle = [0]
+
+    def update_changed():
+        toggle[0] ^= 1
+        return speaker.async_update(changed[toggle[0]])
+
+    yield ("LvtSpeaker.async_update[volume changed]", update_changed, True)
+
+
+# endregion
+
+
+async def run(args) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = FakeHass(config_dir)
+        async for name, func, is_async in benchmarks(hass):
+            if args.filter and args.filter not in name:
+                continue
+            per_call = await measure(func, is_async)
+            # Calibrate next to every benchmark to cancel machine load changes
+            unit = calibrate()
+            results[name] = {"us": per_call * 1e6, "relative": per_call / unit}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", action="store_true", help="save results as baseline")
+    parser.add_argument("--compare", action="store_true", help="compare with baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--filter", default=None, help="run matching benchmarks only")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    results = asyncio.run(run(args))
+
+    baseline = {}
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+    failed = []
+    print(f"{'benchmark':<56}{'us/call':>10}{'baseline':>10}")
+    for name, result in results.items():
+        line = f"{name:<56}{result['us']:>10.2f}"
+        if name in baseline:
+            ratio = result["relative"] / baseline[name]["relative"]
+            line += f"{ratio:>9.2f}x"
+            if ratio > args.tolerance:
+                failed.append(name)
+                line += "  SLOWER"
+        print(line)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "homeassistant": HA_VERSION,
+                    "results": results,
+                },
+                file,
+                indent=2,
+                ensure_ascii=False,
+            )
+        print(f"Baseline saved to {args.baseline}")
+
+    if failed:
+        print(f"{len(failed)} benchmark(s) slower than baseline x{args.tolerance}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""Replay captured LVT websocket sessions against LvtApi.
+
+Inbound frames of capture files (see `capture` option of LVT integration)
+are fed to the real LvtApi through a fake websocket, either at recorded
+speed (scaled with --speed) or as fast as possible (--fast). Intents fired
+by captured FireIntent messages are handled by a stub handler replying
+with speech, so LvtApi sends replies as it does in production.
+
+Reported:
+* replay time, inbound frames per second and CPU time per frame
+* outbound messages by type: replayed vs captured
+* LvtApi metrics and intent dispatcher counters
+
+Requires Home Assistant installed (as in HA development environment).
+
+Usage:
+    python benchmarks/replay_capture.py lvt_capture.bin.1 lvt_capture.bin
+        [--fast | --speed 1.0] [--linger 1.0]
+Rotated files of the same capture are passed oldest first.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "custom-components"))
+
+# Import HA components in the order HA loads them (avoids circular imports)
+import homeassistant.bootstrap  # noqa: E402,F401
+from homeassistant.helpers import intent  # noqa: E402
+
+from bench_e2e import create_hass  # noqa: E402
+from lvt.const import LVT_PLATFORMS, MSG_API_FIRE_INTENT  # noqa: E402
+from lvt.lvt import LvtApi, decode_message  # noqa: E402
+from lvt.lvt_capture import (  # noqa: E402
+    CAPTURE_INBOUND,
+    CAPTURE_OUTBOUND,
+    LvtReplaySocket,
+    read_capture,
+    split_sessions,
+)
+from lvt.lvt_hub import LvtHub  # noqa: E402
+
+
+class ReplayIntentHandler(intent.IntentHandler):
+    """Reply to captured intent with speech"""
+
+    def __init__(self, intent_type: str) -> None:
+        self.intent_type = intent_type
+
+    async def async_handle(self, intent_obj: intent.Intent):
+        response = intent_obj.create_response()
+        response.async_set_speech(f"replay {self.intent_type}")
+        return response
+
+
+def count_messages(frames) -> Counter:
+    """Count messages by type. Frames are decoded as legacy or compact ones"""
+    counts = Counter()
+    for frame in frames:
+        try:
+            counts[str(decode_message(frame)["Message"])] += 1
+        except Exception:
+            counts["<undecodable>"] += 1
+    return counts
+
+
+def intent_types(frames) -> set:
+    """Intents fired by captured FireIntent messages"""
+    types = set()
+    for frame in frames:
+        try:
+            message = decode_message(frame)
+            if message["Message"] == MSG_API_FIRE_INTENT:
+                types.add(str(message["Data"]["Intent"]))
+        except Exception:
+            pass
+    return types
+
+
+async def replay(args, records: list) -> dict:
+    sessions = split_sessions(records)
+    inbound = [r.data for r in records if r.direction == CAPTURE_INBOUND]
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await create_hass(config_dir)
+        for intent_type in intent_types(inbound):
+            intent.async_register(hass, ReplayIntentHandler(intent_type))
+        hub = LvtHub(hass)
+        api = LvtApi(hass, hub, "replay")
+        hub.add_api("replay", api)
+        api.metrics.subscribe()
+        for platform in LVT_PLATFORMS:
+            api.platform_loaded(platform, lambda entities: None)
+
+        sent = []
+        elapsed = 0.0
+        cpu = time.process_time()
+        for session in sessions:
+            ws = LvtReplaySocket(
+                session.inbound, 0 if args.fast else args.speed, args.linger
+            )
+            started = time.monotonic()
+            await api.async_replay(ws, session.protocols if session.resumed else None)
+            elapsed += (ws.finished or time.monotonic()) - started
+            sent.extend(ws.sent)
+        cpu = time.process_time() - cpu
+
+        result = {
+            "sessions": len(sessions),
+            "inbound": len(inbound),
+            "elapsed": elapsed,
+            "cpu": cpu,
+            "replayed": count_messages(sent),
+            "metrics": {
+                name: getattr(api.metrics, name).as_dict()
+                for name in (
+                    "send_latency",
+                    "intent_reply_latency",
+                    "intent_handler_duration",
+                )
+            },
+            "dispatcher": api.intent_dispatcher.stats,
+        }
+        hub.unload()
+        await hass.async_stop(force=True)
+        return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("capture", nargs="+", help="capture files, oldest first")
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed relative to recorded"
+    )
+    parser.add_argument("--fast", action="store_true", help="replay without delays")
+    parser.add_argument(
+        "--linger",
+        type=float,
+        default=1.0,
+        help="seconds to wait for replies once session frames are over",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    records = [record for path in args.capture for record in read_capture(path)]
+    captured = count_messages(
+        r.data for r in records if r.direction == CAPTURE_OUTBOUND
+    )
+    result = asyncio.run(replay(args, records))
+
+    print(
+        f"{result['sessions']} sessions, {result['inbound']} inbound frames "
+        f"replayed in {result['elapsed']:.2f} s "
+        f"({result['inbound'] / max(result['elapsed'], 1e-9):.0f} frames/s)"
+    )
+    print(f"CPU: {result['cpu'] / max(1, result['inbound']) * 1e6:.1f} us per frame")
+    print(f"{'Outbound message':<24} {'replayed':>10} {'captured':>10}")
+    for name in sorted(result["replayed"].keys() | captured.keys()):
+        print(f"{name:<24} {result['replayed'][name]:>10} {captured[name]:>10}")
+    for name, summary in result["metrics"].items():
+        print(
+            f"LvtApi {name:<24} n={summary['count']:<6} "
+            f"p50<={summary['p50_ms']} ms  p99<={summary['p99_ms']} ms"
+        )
+    print(f"Intent dispatcher: {result['dispatcher']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,27 +4,68 @@ from homeassistant.const import SERVICE_RELOAD
 
 from homeassistant.helpers import entity_component, service
 from .lvt import _LOGGER, LvtApi
+from .lvt_hub import LvtHub
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.discovery import async_load_platform
-from .const import DOMAIN, LVT_PLATFORMS, ssl_mode_to_int
+from .const import (
+    DOMAIN,
+    LVT_LEGACY_UNIQUE_ID,
+    LVT_PLATFORMS,
+    LVT_YAML_API,
+    ssl_mode_to_int,
+)
 
 
-async def async_initialize(hass: HomeAssistant, config) -> bool:
+def get_hub(hass: HomeAssistant) -> LvtHub:
+    """Get (create if required) LVT hub"""
     if DOMAIN not in hass.data:
-        hass.data[DOMAIN] = LvtApi(hass)
-
-    lvt: LvtApi = hass.data[DOMAIN]
-    lvt.parse_intents(config)
+        hass.data[DOMAIN] = LvtHub(hass)
+    return hass.data[DOMAIN]
+
+
+async def async_initialize(
+    hass: HomeAssistant, config, config_entry: ConfigEntry = None
+) -> bool:
+    """Configure LVT server connection using YAML config or config entry"""
+    hub = get_hub(hass)
+    if config_entry is None:
+        hub.yaml_configured = True
+        # Invalid intents are reported and not applied (previous ones are
+        # kept): LVT server connection and services are set up anyway
+        if not hub.parse_intents(config) and not isinstance(config, dict):
+            return False
+        key = LVT_YAML_API
+        server_id = None
+    else:
+        key = config_entry.entry_id
+        server_id = config_entry.unique_id
+        if server_id == LVT_LEGACY_UNIQUE_ID:
+            server_id = None
 
     if "server" in config and "password" in config:
+        lvt: LvtApi = hub.apis.get(key)
+        if lvt is None:
+            lvt = LvtApi(
+                hass,
+                hub,
+                server_id,
+                config_entry.entry_id if config_entry is not None else None,
+            )
+            hub.add_api(key, lvt)
         lvt.configure_connection(
             config["server"],
             config["port"] if "port" in config else None,
             config["password"],
             ssl_mode_to_int(config["ssl"] if "ssl" in config else 0),
         )
+        lvt.configure_capture(
+            config.get("capture"),
+            int(config["capture_size"]) * 1024 * 1024
+            if "capture_size" in config
+            else None,
+        )
 
     return True
 
@@ -38,18 +79,22 @@ async def async_setup(hass: HomeAssistant, config) -> bool:
     component = entity_component.EntityComponent(_LOGGER, DOMAIN, hass)
 
     async def reload_lvt_config_handler(service_call) -> None:
-        """Remove all zones and load new ones from config."""
+        """Reload intents and LVT server connection from configuration.yaml"""
         conf = await component.async_prepare_reload(skip_reset=True)
         if conf is None:
             return
-        await async_initialize(hass, config[DOMAIN])
+        # Section removed from configuration.yaml: no intents to track
+        await async_initialize(hass, conf.get(DOMAIN) or {})
 
     _ok = await async_initialize(hass, config[DOMAIN])
     if _ok:
-        for platform in LVT_PLATFORMS:
-            hass.async_create_task(
-                async_load_platform(hass, platform, DOMAIN, {}, config[DOMAIN])
-            )
+        if LVT_YAML_API in hass.data[DOMAIN].apis:
+            for platform in LVT_PLATFORMS:
+                hass.async_create_task(
+                    async_load_platform(
+                        hass, platform, DOMAIN, {"api": LVT_YAML_API}, config[DOMAIN]
+                    )
+                )
         service.async_register_admin_service(
             hass,
             DOMAIN,
@@ -63,7 +108,9 @@ async def async_setup(hass: HomeAssistant, config) -> bool:
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up Lite Voice Terminal using a config entry (with UI)"""
     config_entry.async_on_unload(config_entry.add_update_listener(update_listener))
-    _ok = await async_initialize(hass, {**config_entry.data, **config_entry.options})
+    _ok = await async_initialize(
+        hass, {**config_entry.data, **config_entry.options}, config_entry
+    )
 
     if _ok:
         for platform in LVT_PLATFORMS:
@@ -75,15 +122,20 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
 
 async def async_update_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Re-configure Lite Voice Terminal using a config entry (with UI)"""
-    return await async_initialize(hass, {**config_entry.data, **config_entry.options})
+    return await async_initialize(
+        hass, {**config_entry.data, **config_entry.options}, config_entry
+    )
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, LVT_PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].stop()
-        del hass.data[DOMAIN]
+        hub: LvtHub = hass.data[DOMAIN]
+        hub.remove_api(entry.entry_id)
+        if not hub.apis and not hub.yaml_configured:
+            hub.unload()
+            del hass.data[DOMAIN]
     return unload_ok
 
 
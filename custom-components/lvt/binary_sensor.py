@@ -2,7 +2,6 @@ from homeassistant.components.binary_sensor import (
     DEVICE_CLASS_CONNECTIVITY,
     BinarySensorEntity,
 )
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
     DOMAIN,
@@ -11,28 +10,31 @@ from .const import (
 )
 from .lvt_entity import LvtEntity
 
-LVT_BINARY_SENSOR_ADD_ENTITIES: AddEntitiesCallback = None
-
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the LVT Speaker "binary_sensor" config entry."""
-    await async_setup_platform(hass, config_entry, async_add_entities)
+    await async_setup_platform(
+        hass, config_entry, async_add_entities, {"api": config_entry.entry_id}
+    )
 
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     """Set up the LVT Speaker binary_sensor platform."""
-    global LVT_BINARY_SENSOR_ADD_ENTITIES
-    LVT_BINARY_SENSOR_ADD_ENTITIES = async_add_entities
-    lvt_api = hass.data[DOMAIN]
+    if discovery_info is None:
+        return
+    lvt_api = hass.data[DOMAIN].apis[discovery_info["api"]]
+    lvt_api.platform_loaded("binary_sensor", async_add_entities)
 
+    entities = []
     if "online" not in lvt_api.entities:
-        lvt_api.entities["online"] = LvtOnlineEntity(hass, None)
+        lvt_api.entities["online"] = LvtOnlineEntity(hass, lvt_api, None)
+        entities.append(lvt_api.entities["online"])
 
     for _, speaker in lvt_api.speakers.items():
         if "online" not in speaker.entities:
-            speaker.entities["online"] = LvtOnlineEntity(hass, speaker)
-
-    lvt_api.platform_loaded("binary_sensor")
+            speaker.entities["online"] = LvtOnlineEntity(hass, lvt_api, speaker)
+            entities.append(speaker.entities["online"])
+    lvt_api.add_entities("binary_sensor", entities)
 
 
 class LvtOnlineEntity(BinarySensorEntity, LvtEntity):
@@ -40,22 +42,22 @@ class LvtOnlineEntity(BinarySensorEntity, LvtEntity):
 
     _attr_should_poll = False
 
-    def __init__(self, hass, lvt_speaker):
+    def __init__(self, hass, lvt_api, lvt_speaker):
         """Initialize LVT Speaker Online sensor"""
-        global LVT_BINARY_SENSOR_ADD_ENTITIES
-        super().__init__(hass, lvt_speaker, "online")
+        super().__init__(hass, lvt_api, lvt_speaker, "online")
 
         self._state = None
         self._attr_icon = {True: "mdi:broadcast", False: "mdi:broadcast-off"}
         self._attr_device_class = DEVICE_CLASS_CONNECTIVITY
         if self.speaker_id is None:
             self._attr_name = SERVER_ONLINESTATUS_TITLE
+            if lvt_api.server_id is not None:
+                self._attr_name += f" [{lvt_api.server_id}]"
         else:
             self._attr_name = ONLINESTATUS_TITLE.format(self.speaker_id)
 
         self._attr_is_on: bool = False
         self._attr_should_poll: bool = False
-        LVT_BINARY_SENSOR_ADD_ENTITIES([self])
 
     def set_online(self, is_online: bool):
         """Set online status"""
@@ -66,7 +68,7 @@ class LvtOnlineEntity(BinarySensorEntity, LvtEntity):
             if updated:
                 self._attr_is_on = bool(is_online)
                 self._attr_available = bool(is_online)
-                self.schedule_update_ha_state()
+                self.schedule_state_write()
 
     @property
     def icon(self) -> str:
@@ -82,15 +82,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
-        await self.async_set_unique_id("LVT")
-        self._abort_if_unique_id_configured(updates=user_input)
-
         if user_input is None:
             return self.async_show_form(step_id="user", data_schema=data_schema())
 
+        # Every LVT server is configured with its own config entry
+        await self.async_set_unique_id(f"{user_input['server']}:{user_input['port']}")
+        self._abort_if_unique_id_configured(updates=user_input)
+
         if await async_test(self.hass, user_input):
             return self.async_create_entry(
-                title="Lite Voice Terminal",
+                title=f"LVT Server [{user_input['server']}]",
                 data=user_input,
             )
 
@@ -121,7 +122,10 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
 
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
-        lvt_api: LvtApi = self.hass.data.get(DOMAIN)
+        hub = self.hass.data.get(DOMAIN)
+        lvt_api: LvtApi = (
+            hub.apis.get(self.config_entry.entry_id) if hub is not None else None
+        )
         if lvt_api is None:
             return self.async_abort(reason="not_setup")
 
@@ -1,10 +1,16 @@
 """Constants for the Lite Voice Terminal integration."""
 
+from functools import lru_cache
 from typing import Final
 from homeassistant.util import slugify
 
 DOMAIN: Final = "lvt"
-LVT_PLATFORMS: list[str] = ["binary_sensor", "number", "select"]
+LVT_PLATFORMS: list[str] = ["binary_sensor", "number", "select", "sensor"]
+
+# hass.data[DOMAIN].apis key of LVT server configured in YAML
+LVT_YAML_API: Final = "yaml"
+# Unique id of config entries created before multiple LVT servers were supported
+LVT_LEGACY_UNIQUE_ID: Final = "LVT"
 
 DEFAULT_SERVER: Final = "127.0.0.1"
 DEFAULT_PORT: Final = 2700
@@ -18,6 +24,7 @@ IMPORTANCE_TITLE = "Message Filter [{}]"
 VOLUME_TITLE = "Volume [{}]"
 ONLINESTATUS_TITLE = "Online status [{}]"
 SERVER_ONLINESTATUS_TITLE = "LVT Server Online status"
+SERVER_METRIC_TITLE = "LVT Server {}"
 
 
 SSL_MODES = [
@@ -39,6 +46,9 @@ MSG_API_SERVER_STATUS: Final = "ServerStatus"
 # Initialize LVT server with list of intents to track.
 MSG_API_SET_INTENTS: Final = "SetIntents"
 
+# Add, replace or remove some intents tracked by LVT server (PROTOCOL_INTENTS_DELTA)
+MSG_API_UPDATE_INTENTS: Final = "UpdateIntents"
+
 # Request from LVT server to fire an intent
 MSG_API_FIRE_INTENT: Final = "FireIntent"
 
@@ -71,19 +81,83 @@ MSG_API_RESTART: Final = "Restart"
 
 # endregion
 
+# region API protocol extensions, negotiated with MSG_API_AUTHORIZE
+# Message "Data" is passed as nested object rather than JSON-encoded string
+PROTOCOL_COMPACT: Final = "Compact"
+
+# Large messages are sent as zlib-compressed binary frames
+PROTOCOL_ZLIB: Final = "Zlib"
+
+# LVT server reports version of intents it has (Authorize reply "IntentsVersion")
+# and accepts MSG_API_UPDATE_INTENTS
+PROTOCOL_INTENTS_DELTA: Final = "IntentsDelta"
+
+# FireIntent may carry "TraceId" field, messages caused by the intent are tagged with it
+PROTOCOL_TRACE: Final = "Trace"
+
+# Message may carry "RequestId" field, LVT server replies to it with the same RequestId
+PROTOCOL_REQUESTS: Final = "Requests"
+
+# Supported protocol extensions
+LVT_PROTOCOLS: list[str] = [
+    PROTOCOL_COMPACT,
+    PROTOCOL_ZLIB,
+    PROTOCOL_INTENTS_DELTA,
+    PROTOCOL_TRACE,
+    PROTOCOL_REQUESTS,
+]
+
+# endregion
 
-def lvt_unique_id(speaker_id: str, e_id: str) -> str:
-    """Generate unique_id as lvt_<speaker_id>_<e_id>"""
+
+@lru_cache(maxsize=4096)
+def lvt_unique_id(speaker_id: str, e_id: str, server_id: str = None) -> str:
+    """Generate unique_id as lvt_<speaker_id>_<e_id>. Speakers of LVT server
+    other than the default one get lvt_<server_id>@<speaker_id>_<e_id>"""
     eid = DOMAIN + "_"
     if speaker_id is not None:
+        if server_id is not None:
+            eid += slugify(server_id) + "@"
         eid += slugify(speaker_id) + "_"
     eid += slugify(e_id)
     return eid
 
 
-def lvt_entity_id(speaker_id: str, e_id: str) -> str:
-    """Generate entity_id as lvt.lvt_<speaker_id>_<e_id>"""
-    return DOMAIN + "." + lvt_unique_id(speaker_id, e_id)
+def lvt_server_device_id(server_id: str) -> str:
+    """Device registry identifier of LVT server device. Speaker identifiers
+    are slugified speaker ids so "@" prefix never clashes with them"""
+    return "@server" if server_id is None else "@server_" + slugify(server_id)
+
+
+def is_lvt_server_device_id(identifier: str) -> bool:
+    """Device registry identifier belongs to LVT server device"""
+    return str(identifier).startswith("@server")
+
+
+def lvt_speaker_device_id(server_id: str, speaker_id: str) -> str:
+    """Device registry identifier of LVT speaker. Several LVT servers may
+    have terminals with the same id, so speakers of servers other than
+    the default one are namespaced as <server_id>@<speaker_id>"""
+    if server_id is None:
+        return slugify(speaker_id)
+    return slugify(server_id) + "@" + slugify(speaker_id)
+
+
+def parse_lvt_speaker_device_id(server_id: str, identifier: str) -> str:
+    """Speaker id of device registry identifier (None if identifier is not
+    one of LVT server speakers)"""
+    if is_lvt_server_device_id(identifier):
+        return None
+    prefix, _, speaker_id = str(identifier).rpartition("@")
+    if prefix != ("" if server_id is None else slugify(server_id)):
+        return None
+    return speaker_id
+
+
+def lvt_entity_id(speaker_id: str, e_id: str, server_id: str = None) -> str:
+    """Generate entity_id as lvt.lvt_<speaker_id>_<e_id>
+    (lvt.lvt_<server_id>_<speaker_id>_<e_id> for namespaced speakers)"""
+    return DOMAIN + "." + lvt_unique_id(speaker_id, e_id, server_id).replace("@", "_")
 
 
 def ssl_mode_to_int(ssl_mode: str) -> int:
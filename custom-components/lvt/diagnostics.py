@@ -0,0 +1,48 @@
+"""Diagnostics support for Lite Voice Terminal"""
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"password"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict:
+    """LVT server connection state, metrics and recent intent traces"""
+    result = {
+        "config": async_redact_data(
+            {**config_entry.data, **config_entry.options}, TO_REDACT
+        ),
+    }
+    hub = hass.data.get(DOMAIN)
+    lvt_api = hub.apis.get(config_entry.entry_id) if hub is not None else None
+    if lvt_api is None:
+        return result
+
+    metrics = lvt_api.metrics
+    result.update(
+        {
+            "online": lvt_api.online,
+            "authorized": lvt_api.authorized,
+            "speakers": sorted(lvt_api.speakers),
+            "queue_depth": lvt_api.queue_depth,
+            "intent_dispatcher": lvt_api.intent_dispatcher.stats,
+            "metrics": {
+                "enabled": metrics.enabled,
+                "messages_sent": dict(metrics.sent),
+                "messages_received": dict(metrics.received),
+                "send_latency": metrics.send_latency.as_dict(),
+                "intent_reply_latency": metrics.intent_reply_latency.as_dict(),
+                "intent_handler_duration": metrics.intent_handler_duration.as_dict(),
+                "reconnects": metrics.reconnects,
+                "auth_time": metrics.auth_time,
+            },
+            "traces": lvt_api.tracer.export(),
+        }
+    )
+    return result
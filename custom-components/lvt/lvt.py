@@ -1,20 +1,30 @@
 """LVT API"""
 import asyncio
-import json
 import logging
 import random
 import ssl
 import time
+import zlib
 
 import aiohttp
-from homeassistant.core import HassJob
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
 
 from homeassistant.helpers.typing import HomeAssistantType
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.area_registry import EVENT_AREA_REGISTRY_UPDATED
+from homeassistant.helpers.device_registry import (
+    EVENT_DEVICE_REGISTRY_UPDATED,
+    DeviceEntryType,
+)
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.helpers.storage import Store
+from homeassistant.util import slugify
 from homeassistant.helpers import intent
 from .const import (
     DOMAIN,
     LVT_PLATFORMS,
+    LVT_PROTOCOLS,
     MSG_API_AUTHORIZE,
     MSG_API_ERROR,
     MSG_API_FIRE_INTENT,
@@ -27,11 +37,52 @@ from .const import (
     MSG_API_SERVER_STATUS,
     MSG_API_SET_INTENTS,
     MSG_API_SPEAKER_STATUS,
+    MSG_API_UPDATE_INTENTS,
+    PROTOCOL_COMPACT,
+    PROTOCOL_INTENTS_DELTA,
+    PROTOCOL_REQUESTS,
+    PROTOCOL_TRACE,
+    PROTOCOL_ZLIB,
+    lvt_server_device_id,
+    lvt_unique_id,
+    parse_lvt_speaker_device_id,
 )
+from .lvt_capture import CAPTURE_MAX_BYTES, LvtCapture
+from .lvt_codec import json_dumps, json_dumps_bytes, json_loads
+from .lvt_dispatcher import LvtIntentDispatcher
+from .lvt_metrics import LvtMetrics
+from .lvt_outbox import PRIORITY_AUTHORIZE, LvtOutbox
 from .lvt_speaker import LvtSpeaker
+from .lvt_trace import LvtTracer, current_trace_id, new_trace_id
 
 _LOGGER = logging.getLogger(__name__)
 
+# Delay (seconds) to collect speaker volume/filter changes before pushing them to LVT server
+SPEAKERS_SYNC_DELAY = 0.3
+# Time allowed to get authorization response after connecting LVT server
+AUTHORIZATION_TIMEOUT = 5
+# Time (seconds) allowed to load all LVT platforms before reporting an error
+PLATFORMS_TIMEOUT = 30
+# Reconnect delay range (seconds)
+RECONNECT_DELAY_MIN = 1
+RECONNECT_DELAY_MAX = 300
+
+# Default time (seconds) to wait for LVT server reply to blocking service call
+REQUEST_TIMEOUT = 60
+
+# Minimal size of the frame to be compressed (PROTOCOL_ZLIB)
+COMPRESS_THRESHOLD = 4096
+
+OUTBOX_STORAGE_VERSION = 1
+OUTBOX_STORAGE_KEY = f"{DOMAIN}.outbox"
+# Delay (seconds) to collect outbox changes before saving it
+OUTBOX_SAVE_DELAY = 1
+
+
+class LvtRequestsNotSupported(Exception):
+    """LVT server does not reply to requests (PROTOCOL_REQUESTS not negotiated)"""
+
+
 # region get_protocol / get_ssl_context #########################################
 def get_protocol(ssl_mode: int) -> str:
     """HTTPS or HTTP"""
@@ -54,6 +105,34 @@ def get_ssl_context(ssl_mode: int):
 # endregion
 
 
+# region encode_message / decode_message ########################################
+def encode_message(message: dict, protocols=()):
+    """Encode message to websocket frame (str or compressed bytes)"""
+    if "TraceId" in message and PROTOCOL_TRACE not in protocols:
+        message = {k: v for k, v in message.items() if k != "TraceId"}
+    if "RequestId" in message and PROTOCOL_REQUESTS not in protocols:
+        message = {k: v for k, v in message.items() if k != "RequestId"}
+    if PROTOCOL_COMPACT not in protocols and "Data" in message:
+        message = {**message, "Data": json_dumps(message["Data"])}
+    frame = json_dumps_bytes(message)
+    if PROTOCOL_ZLIB in protocols and len(frame) >= COMPRESS_THRESHOLD:
+        return zlib.compress(frame)
+    return frame.decode("utf-8")
+
+
+def decode_message(frame, protocols=()) -> dict:
+    """Decode websocket frame (str or compressed bytes)"""
+    if isinstance(frame, (bytes, bytearray)):
+        frame = zlib.decompress(frame)
+    request = json_loads(frame)
+    if PROTOCOL_COMPACT not in protocols and isinstance(request.get("Data"), str):
+        request["Data"] = json_loads(request["Data"])
+    return request
+
+
+# endregion
+
+
 class LvtApi:
     """LVT API class."""
 
@@ -61,10 +140,17 @@ class LvtApi:
     def __init__(
         self,
         hass: HomeAssistantType,
+        hub,
+        server_id: str = None,
+        config_entry_id: str = None,
     ) -> None:
-        """Constructor"""
+        """Constructor. server_id distinguishes entities of several LVT servers
+        (None for the default one), config_entry_id is None for YAML config"""
         self._api_id = str(random.randrange(100, 999))
         self.hass: HomeAssistantType = hass
+        self.__hub = hub
+        self.__server_id = server_id
+        self.__config_entry_id = config_entry_id
         self.__entities = {}
         self.__speakers = {}
         self.__server = None
@@ -72,36 +158,68 @@ class LvtApi:
         self.__password = None
         self.__ssl_mode = 0
         self.__online = False
-        self.__triggers = []
+        self.__authorized = False
         self.__client_task = None
         self.__ws = None
-        self.__queue = []
-        self.__speakers_synced = time.time()
-        self.__wstask_id = str(random.randrange(100, 999))
-        self.__intents = []
-        hass.services.async_register(DOMAIN, "play", self.handle_play)
-        hass.services.async_register(DOMAIN, "say", self.handle_say)
-        hass.services.async_register(DOMAIN, "confirm", self.handle_confirm)
-        hass.services.async_register(DOMAIN, "negotiate", self.handle_negotiate)
-        hass.services.async_register(
-            DOMAIN, "listening_start", self.handle_listening_start
-        )
-        hass.services.async_register(
-            DOMAIN, "listening_stop", self.handle_listening_stop
+        self.__queue = LvtOutbox()
+        self.__store = Store(
+            hass,
+            OUTBOX_STORAGE_VERSION,
+            OUTBOX_STORAGE_KEY
+            if server_id is None
+            else f"{OUTBOX_STORAGE_KEY}_{slugify(server_id)}",
         )
-        hass.services.async_register(DOMAIN, "restart_speaker", self.handle_restart)
+        self.__outbox_restored = False
+        # Outbox storage may hold messages (and has to be rewritten once sent)
+        self.__outbox_stored = False
+        self.__reconnect_delay = RECONNECT_DELAY_MIN
+        self.__protocols = set()
+        self.__server_intents_version = None
+        self.__intents_synced = None
+        self.__dirty_speakers = set()
+        self.__speakers_sync = None
+        self.__requests = {}
+        self.__intent_dispatcher = LvtIntentDispatcher(hass, self.__async_handle_intent)
+        self.__metrics = LvtMetrics()
+        self.__tracer = LvtTracer()
+        self.__capture = None
+        self.__connect_started = None
+        self.__device_info = None
+        self.__request_id = 0
+        self.__wstask_id = str(random.randrange(100, 999))
         self.__loaded_platforms = set()
+        # Set once platforms are loaded and connection is configured
+        self.__ready = asyncio.Event()
+        self.__add_entities = {}
+        self.__pending_entities = {}
+        self.__add_entities_handle = None
+        self.__speakers_index = None
+        self.__unsub_listeners = [
+            hass.bus.async_listen(
+                event, self._async_registry_updated, event_filter=event_filter
+            )
+            for event, event_filter in (
+                (EVENT_DEVICE_REGISTRY_UPDATED, self._device_event_concerns_speakers),
+                (EVENT_ENTITY_REGISTRY_UPDATED, self._entity_event_concerns_speakers),
+                (EVENT_AREA_REGISTRY_UPDATED, self._area_event_concerns_speakers),
+            )
+        ]
 
     def __del__(self):
         """Destructor (just in case)"""
         self.stop()
-        self.hass.services.async_remove(DOMAIN, "play")
-        self.hass.services.async_remove(DOMAIN, "say")
-        self.hass.services.async_remove(DOMAIN, "confirm")
-        self.hass.services.async_remove(DOMAIN, "negotiate")
-        self.hass.services.async_remove(DOMAIN, "listening_start")
-        self.hass.services.async_remove(DOMAIN, "listening_stop")
-        self.hass.services.async_remove(DOMAIN, "restart_speaker")
+
+    def unload(self):
+        """Stop LVT API client and unsubscribe from HA events"""
+        self.stop()
+        for unsub in self.__unsub_listeners:
+            unsub()
+        self.__unsub_listeners = []
+        if self.__add_entities_handle is not None:
+            self.__add_entities_handle.cancel()
+            self.__add_entities_handle = None
+        self.__pending_entities.clear()
+        self.configure_capture(None)
 
     def configure_connection(
         self, server: str, port: int, password: str, _ssl_mode: int
@@ -121,24 +239,62 @@ class LvtApi:
             and _ssl_mode <= 2
             else 0
         )
-        self.__loaded_platforms = set()
+        self.__update_ready()
         self.create_registered_speakers()
         self.start()
 
+    def configure_capture(self, path: str, max_bytes: int = None) -> None:
+        """Capture websocket frames to file (relative to HA config directory).
+        Capture is stopped if path is empty"""
+        if self.__capture is not None:
+            if path and self.hass.config.path(path) == self.__capture.path:
+                return
+            self.__capture.close()
+            self.__capture = None
+        if path:
+            self.__capture = LvtCapture(
+                self.hass, self.hass.config.path(path), max_bytes or CAPTURE_MAX_BYTES
+            )
+            self.log_debug("Capturing websocket frames to %s", self.__capture.path)
+
     def configure_intents(self):
         """process and check intents passed"""
         if self.online:
             pass
 
-    def platform_loaded(self, platform):
+    def platform_loaded(self, platform, async_add_entities):
         """Register platform as loaded"""
+        self.__add_entities[platform] = async_add_entities
         self.__loaded_platforms.add(platform)
+        self.__update_ready()
+        if platform in self.__pending_entities:
+            self.__schedule_add_entities()
+
+    @callback
+    def add_entities(self, platform: str, entities: list):
+        """Queue entities to be added to HA. Entities queued within the same
+        event loop iteration are added with single platform' add_entities call
+        (once platform is loaded)"""
+        if not entities:
+            return
+        self.__pending_entities.setdefault(platform, []).extend(entities)
+        if platform in self.__add_entities:
+            self.__schedule_add_entities()
+
+    def __schedule_add_entities(self):
+        if self.__add_entities_handle is None:
+            self.__add_entities_handle = self.hass.loop.call_soon(
+                self.__add_pending_entities
+            )
 
-    def add_trigger(self, config, action, automation):
-        """Register trigger to track"""
-        self.__triggers.append(
-            {"config": config, "action": action, "automation": automation}
-        )
+    @callback
+    def __add_pending_entities(self):
+        """Add queued entities of loaded platforms"""
+        self.__add_entities_handle = None
+        for platform in list(self.__pending_entities):
+            if platform in self.__add_entities:
+                entities = self.__pending_entities.pop(platform)
+                self.__add_entities[platform](entities)
 
     # endregion
 
@@ -163,6 +319,32 @@ class LvtApi:
         """LVT Server SSL status"""
         return int(self.__ssl_mode)
 
+    @property
+    def server_id(self) -> str:
+        """LVT Server identifier (None for the default server)"""
+        return self.__server_id
+
+    @property
+    def config_entry_id(self) -> str:
+        """Config entry id (None if configured in YAML)"""
+        return self.__config_entry_id
+
+    @property
+    def device_info(self) -> dict:
+        """LVT server device (holds server entities)"""
+        if self.__device_info is None:
+            name = "LVT Server"
+            if self.server_id is not None:
+                name += f" [{self.server_id}]"
+            self.__device_info = {
+                "identifiers": {(DOMAIN, lvt_server_device_id(self.server_id))},
+                "name": name,
+                "manufacturer": "Lite Voice Terminal",
+                "model": "LVT Server",
+                "entry_type": DeviceEntryType.SERVICE,
+            }
+        return self.__device_info
+
     @property
     def entities(self) -> dict[str, any]:
         """Get the LVT Speaker Id"""
@@ -174,9 +356,19 @@ class LvtApi:
         return self.__speakers
 
     @property
-    def intents(self) -> list:
-        """self.intents"""
-        return self.__intents
+    def intents(self) -> dict:
+        """Intents by intent key"""
+        return self.__hub.intents
+
+    @property
+    def state_writer(self):
+        """Entity state writes batcher"""
+        return self.__hub.state_writer
+
+    @property
+    def tracer(self) -> LvtTracer:
+        """Spans of intents fired by LVT server"""
+        return self.__tracer
 
     @property
     def started(self) -> bool:
@@ -193,6 +385,18 @@ class LvtApi:
         """If all platforms loaded"""
         return set(self.__loaded_platforms) == set(LVT_PLATFORMS)
 
+    @property
+    def configured(self) -> bool:
+        """If LVT server connection is configured"""
+        return bool(self.__server) and bool(self.__port) and bool(self.__password)
+
+    def __update_ready(self):
+        """Wake up WS client waiting for platforms and configuration"""
+        if self.platforms_loaded and self.configured:
+            self.__ready.set()
+        else:
+            self.__ready.clear()
+
     @online.setter
     def online(self, is_online: bool):
         """Update .online property and "lvt.online" entity"""
@@ -212,11 +416,26 @@ class LvtApi:
             for _, speaker in self.speakers.items():
                 speaker.set_server_online(is_online)
 
+    @property
+    def intent_dispatcher(self) -> LvtIntentDispatcher:
+        """FireIntent worker pool"""
+        return self.__intent_dispatcher
+
     @property
     def authorized(self) -> bool:
         """If WS client is connected and atuthorized on LVT server"""
         return self.__authorized
 
+    @property
+    def metrics(self) -> LvtMetrics:
+        """Connection performance counters"""
+        return self.__metrics
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of messages waiting to be sent to LVT server"""
+        return len(self.__queue)
+
     # endregion
 
     # region WebSock client implementation: start / stop / send_message #########
@@ -235,6 +454,7 @@ class LvtApi:
             self.log_debug("Stopping websock client")
             self.__client_task.cancel()
             self.__client_task = None
+            self.__intent_dispatcher.stop()
 
     def send_message(
         self,
@@ -242,255 +462,574 @@ class LvtApi:
         status_code: int = 0,
         status: str = None,
         data=None,
+        envelope: dict = None,
     ):
-        """Queue message to LVT server"""
+        """Queue message to LVT server. Optional envelope contains
+        additional message fields (protocol extensions).
+        Messages sent while handling an intent are tagged with its trace id"""
         message = {"Message": msg, "StatusCode": status_code}
+        trace_id = current_trace_id.get()
+        if trace_id is not None:
+            message["TraceId"] = trace_id
+        if envelope:
+            message.update(envelope)
         if status is not None:
             message["Status"] = str(status)
         if data is not None:
-            message["Data"] = json.dumps(data)
+            message["Data"] = data
+
+        if not self.__queue.put(message):
+            self.log_warning("Outbound queue overflow, %s message dropped", msg)
+        if not self.__authorized:
+            # Message is waiting for LVT server connection
+            self.__schedule_outbox_save()
+
+    def __schedule_outbox_save(self):
+        """Save outbox to HA storage so queued messages survive HA restart.
+        Storage is only written while it holds or should hold some messages"""
+        if not self.__outbox_restored:
+            # Messages queued before restore are saved along with restored ones
+            return
+        if self.__queue.persistent or self.__outbox_stored:
+            self.__outbox_stored = True
+            self.__store.async_delay_save(self.__dump_outbox, OUTBOX_SAVE_DELAY)
+
+    def __dump_outbox(self) -> dict:
+        messages = self.__queue.dump()
+        self.__outbox_stored = bool(messages)
+        return {"messages": messages}
+
+    async def __async_restore_outbox(self):
+        """Load messages queued before HA restart"""
+        if self.__outbox_restored:
+            return
+        try:
+            stored = await self.__store.async_load()
+        except Exception as ex:
+            self.log_warning("Error loading outbox: %s", str(ex))
+            stored = None
+        self.__outbox_restored = True
+        if isinstance(stored, dict) and isinstance(stored.get("messages"), list):
+            self.__outbox_stored = bool(stored["messages"])
+            self.__queue.restore(stored["messages"])
+            self.log_debug("%s queued messages restored", len(self.__queue))
+        self.__schedule_outbox_save()
+
+    async def async_send_request(
+        self, msg: str, data=None, timeout: float = REQUEST_TIMEOUT
+    ) -> dict:
+        """Send message to LVT server and wait for the reply.
+        Reply is correlated with the request by "RequestId" message field.
+        Raises LvtRequestsNotSupported if LVT server does not reply to requests"""
+        if self.__authorized and PROTOCOL_REQUESTS not in self.__protocols:
+            raise LvtRequestsNotSupported()
+        self.__request_id += 1
+        request_id = f"{self._api_id}.{self.__request_id}"
+        future = self.hass.loop.create_future()
+        self.__requests[request_id] = future
+        self.send_message(msg, data=data, envelope={"RequestId": request_id})
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except BaseException:
+            # Request not sent yet must not be sent once caller gave up
+            if self.__queue.remove_request(request_id):
+                self.__schedule_outbox_save()
+            raise
+        finally:
+            self.__requests.pop(request_id, None)
+
+    def __resolve_request(self, request: dict):
+        """Pass LVT server reply to the code awaiting it"""
+        future = self.__requests.pop(str(request["RequestId"]), None)
+        if future is not None and not future.done():
+            future.set_result(request)
+
+    async def __async_call_server(self, call, msg: str, data: dict):
+        """Send service call message to LVT server.
+        Blocking calls wait for server reply and return response data"""
+        if not bool(call.data.get("blocking", False)):
+            self.send_message(msg, data=data)
+            return None
 
-        self.__queue.append(message)
+        timeout = float(call.data.get("timeout", REQUEST_TIMEOUT))
+        try:
+            reply = await self.async_send_request(msg, data, timeout)
+        except asyncio.TimeoutError as ex:
+            raise HomeAssistantError(
+                f"lvt.{call.service}: no reply from LVT server {self.server} in {timeout} seconds"
+            ) from ex
+        except LvtRequestsNotSupported as ex:
+            raise HomeAssistantError(
+                f"lvt.{call.service}: LVT server {self.server} does not support blocking calls"
+            ) from ex
+        status_code = int(reply["StatusCode"]) if "StatusCode" in reply else 0
+        status = str(reply["Status"]) if "Status" in reply else None
+        if status_code != 0:
+            raise HomeAssistantError(
+                f"lvt.{call.service}: LVT server {self.server} error #{status_code}: {status}"
+            )
+        return {
+            "server": self.server,
+            "terminals": data.get("Terminals"),
+            "status": status,
+            "data": reply.get("Data"),
+        }
+
+    @callback
+    def async_speaker_changed(self, speaker: LvtSpeaker):
+        """Schedule speaker state changes to be sent to LVT server"""
+        self.__dirty_speakers.add(speaker.id)
+        if self.__speakers_sync is None:
+            self.__speakers_sync = self.hass.loop.call_later(
+                SPEAKERS_SYNC_DELAY, self.synchronize_speakers
+            )
 
     def synchronize_speakers(self):
         """Send speaker state changes to LVT server"""
-        self.__speakers_synced = time.time()
+        if self.__speakers_sync is not None:
+            self.__speakers_sync.cancel()
+            self.__speakers_sync = None
+        if not self.__dirty_speakers:
+            return
         data = {}
-        for _, speaker in self.speakers.items():
-            if speaker.out_of_sync:
+        for speaker_id in self.__dirty_speakers:
+            speaker = self.speakers.get(speaker_id)
+            if speaker is not None and speaker.out_of_sync:
                 data[speaker.id] = {"Volume": speaker.volume, "Filter": speaker.filter}
+        self.__dirty_speakers.clear()
         if data:
             self.send_message(MSG_API_SPEAKER_STATUS, data=data)
 
-    def send_intents(self):
-        """Send active intents configuration to LVT server"""
-        self.send_message(MSG_API_SET_INTENTS, data=self.intents)
+    def sync_intents(self):
+        """Push intents changes to connected LVT server"""
+        if self.authorized:
+            synced = self.__intents_synced
+            self.send_intents(synced[0] if synced is not None else None)
+
+    def send_intents(self, server_version: str = None):
+        """Send active intents configuration to LVT server having server_version
+        of intents: nothing if server intents are up to date, changes only
+        if server has intents sent before, full list otherwise"""
+        intents = self.intents
+        version = self.__hub.intents_version
+        synced = self.__intents_synced
+        self.__intents_synced = (version, intents)
+        # Pending (outdated) intents message is replaced with the full list
+        if (
+            PROTOCOL_INTENTS_DELTA in self.__protocols
+            and MSG_API_SET_INTENTS not in self.__queue
+        ):
+            if server_version == version:
+                self.log_debug("Intents are up to date")
+                return
+            if synced is not None and server_version == synced[0]:
+                base = synced[1]
+                self.send_message(
+                    MSG_API_UPDATE_INTENTS,
+                    data={
+                        "Version": version,
+                        "BaseVersion": server_version,
+                        "Add": [i for k, i in intents.items() if base.get(k) != i],
+                        "Remove": [
+                            {"Intent": i["Intent"], "Terminals": i["Terminals"]}
+                            for k, i in base.items()
+                            if k not in intents
+                        ],
+                    },
+                )
+                return
+        self.send_message(
+            MSG_API_SET_INTENTS,
+            data=list(intents.values()),
+            envelope={"IntentsVersion": version},
+        )
 
     # endregion
 
     # region __websock_client() #################################################
-    async def __websock_client(self):
+    async def __async_wait_ready(self):
+        """Wait until platforms are loaded and connection is configured"""
+        if self.__ready.is_set():
+            return
         self.log_debug(
             "Waiting for configuration and loading platforms: %s", LVT_PLATFORMS
         )
-        session_started = time.time()
-        error_reported = False
-        while True:
-            if (
-                not self.platforms_loaded
-                or not bool(self.__server)
-                or not bool(self.__port)
-                or not bool(self.__password)
-            ):
-                if ((time.time() - session_started) > 30) and not error_reported:
-                    error_reported = True
-                    if not self.platforms_loaded:
-                        self.log_error("Not all LVT platforms loaded!")
-                    else:
-                        self.log_error(
-                            "Missing Lite Voice Terminal connection config. Please consult LVT documentation"
-                        )
-                await asyncio.sleep(1)
-                continue
-            else:
-                error_reported = False
+        if not self.configured:
+            self.log_error(
+                "Missing Lite Voice Terminal connection config. Please consult LVT documentation"
+            )
+        try:
+            await asyncio.wait_for(self.__ready.wait(), PLATFORMS_TIMEOUT)
+        except asyncio.TimeoutError:
+            if not self.platforms_loaded:
+                self.log_error(
+                    "Not all LVT platforms loaded: %s",
+                    set(LVT_PLATFORMS) - self.__loaded_platforms,
+                )
+            await self.__ready.wait()
 
+    async def __websock_client(self):
+        await self.__async_restore_outbox()
+        while True:
+            await self.__async_wait_ready()
             self.online = False
             try:
                 url = f"{get_protocol(self.ssl_mode)}://{self.server}:{self.port}/api"
                 self.log_debug("Connecting %s", url)
-                self.__speakers_synced = time.time()
+                self.__connect_started = time.monotonic()
                 async with async_get_clientsession(self.hass).ws_connect(
                     url, heartbeat=10, ssl=get_ssl_context(self.ssl_mode)
                 ) as ws:
-                    self.__ws = ws
-                    session_started = time.time()
-                    self.online = True
-                    if self.password is not None:
-                        self.send_message(MSG_API_AUTHORIZE, data=str(self.password))
-                    while True:
-                        # Check if not authorized within 5 seconds
-                        if not self.authorized and (
-                            (time.time() - session_started) > 5
-                        ):
-                            self.log_error("Not authorized!")
-                            await ws.close()
-                            break
-                        while len(self.__queue) > 0:
-                            await self.__ws.send_json(self.__queue[0])
-                            self.__queue.pop(0)
-
-                        if (time.time() - self.__speakers_synced) > 10:
-                            self.synchronize_speakers()
-
-                        msg = None  # команда
-                        status_code = 0  # 0 if Ok
-                        status = None  # сообщение об ошибке (опционально)
-                        data = None  # Данные, зависит от msg
-
-                        # region ожидание сообщения ##########
-                        try:
-                            msg = await ws.receive(0.5)
-                            if msg is None:
-                                continue
-                            elif msg.type == aiohttp.WSMsgType.TEXT:
-                                # Разбираем пакет, тупо игнорируя ошибки
-                                try:
-                                    request = json.loads(str(msg.data))
-                                    msg = str(request["Message"])
-                                    status_code = (
-                                        int(request["StatusCode"])
-                                        if "StatusCode" in request
-                                        else 0
-                                    )
-                                    status = (
-                                        str(request["Status"])
-                                        if "Status" in request
-                                        else None
-                                    )
-                                    data = (
-                                        json.loads(str(request["Data"]))
-                                        if "Data" in request
-                                        else None
-                                    )
-                                except Exception:
-                                    continue
-                            elif msg.type == aiohttp.WSMsgType.CLOSED:
-                                break
-                            else:
-                                continue
-                        except asyncio.TimeoutError:
-                            continue
-                        # endregion
-
-                        # Process message received
-                        if msg == MSG_API_AUTHORIZE:  # LVT Server status message
-                            if status_code == 0:
-                                self.log_debug("Authorized")
-                                self.__authorized = True
-                                self.send_intents()
-                            else:
-                                self.log_error(
-                                    "Authnentication failure: Invalid password."
-                                )
-                                await ws.close()
-
-                        if msg == MSG_API_SERVER_STATUS:  # LVT Server status message
-                            if "Terminals" in data:
-                                for _, speaker in data["Terminals"].items():
-                                    await self._async_update_speaker_status(speaker)
-                            to_delete = [
-                                speaker_id
-                                for speaker_id in self.speakers
-                                if speaker_id not in data["Terminals"]
-                            ]
-                            for speaker_id in to_delete:
-                                await self._async_delete_speaker(speaker_id)
-
-                        elif msg == MSG_API_SPEAKER_STATUS:  # Speaker status update
-                            for _, speaker in data.items():
-                                await self._async_update_speaker_status(speaker)
-
-                        elif msg == MSG_API_FIRE_INTENT:
-                            if "Intent" not in data:
-                                self.log_error(
-                                    "LVT API.FireIntent: Intent not specified "
-                                )
-                            intent_type = data["Intent"]
-                            intent_data = data["Data"] if "Data" in data else {}
-                            intent_data["intent"] = intent_type
-
-                            intent_importance = (
-                                data["Importance"] if "Importance" in data else 1
-                            )
-                            intent_speaker = (
-                                data["Terminal"] if "Terminal" in data else None
-                            )
-
-                            # region Fire An Intent
-                            slots = {
-                                key: {"value": value}
-                                for key, value in intent_data.items()
-                            }
-                            try:
-                                response = await intent.async_handle(
-                                    self.hass, DOMAIN, intent_type, slots
-                                )
-                                self.log(str(response))
-
-                                if "plain" in response.speech:
-                                    self.send_message(
-                                        MSG_API_SAY,
-                                        data={
-                                            "Say": response.speech["plain"]["speech"],
-                                            "Importance": intent_importance,
-                                            "Terminals": [intent_speaker],
-                                        },
-                                    )
-
-                            except intent.UnknownIntent:
-                                self.log_warning(
-                                    "Received unknown intent %s", intent_type
-                                )
-
-                            except intent.InvalidSlotInfo as err:
-                                self.log_error(
-                                    "Received invalid slot data for intent %s: %s",
-                                    intent_type,
-                                    err,
-                                )
-
-                            except intent.IntentError as e:
-                                self.log_error(
-                                    "Handling request for %s: %s %s",
-                                    intent_type,
-                                    type(e).__name__,
-                                    e,
-                                )
-                            # endregion
-
-                            # region Trigger Triggers
-                            for trigger in self.__triggers:
-                                cfg = trigger["config"]
-                                t_intent = (
-                                    str(cfg["intent"]) if "intent" in cfg else None
-                                )
-                                if t_intent.lower() == intent_type.lower():
-                                    job = HassJob(trigger["action"])
-                                    trigger_data = trigger["automation"]["trigger_data"]
-
-                                    self.hass.async_run_hass_job(
-                                        job,
-                                        {
-                                            "trigger": {
-                                                **trigger_data,
-                                                "platform": DOMAIN,
-                                                "intent": intent_type,
-                                                "data": intent_data,
-                                                "description": f'Intent "{intent_type}" fired by "{intent_speaker}"',
-                                            }
-                                        },
-                                        None,
-                                    )
-                            # endregion
-                        elif msg == MSG_API_ERROR:
-                            self.log_error(
-                                "LVT Server error #%s: %s",
-                                str(status_code),
-                                str(status),
-                            )
+                    self.__metrics.connects += 1
+                    if self.__capture is not None:
+                        self.__capture.connected(url)
+                    await self.__async_run_session(ws)
 
             except aiohttp.ClientConnectionError as e:
                 self.log_warning("Error connecting server: %s", str(e))
-                await asyncio.sleep(5)
             except Exception as ex:
-                self.log_error("API error [%s]: %s", type(e).__name__, str(ex))
-                await asyncio.sleep(5)
+                self.log_error("API error [%s]: %s", type(ex).__name__, str(ex))
             except:
                 self.log_debug("API client stopped")
                 break
             finally:
+                self.__ws = None
                 self.online = False
+                # Messages left unsent are waiting for the next session
+                self.__schedule_outbox_save()
+
+            try:
+                await asyncio.sleep(self.__next_reconnect_delay())
+            except:
+                self.log_debug("API client stopped")
+                break
+
+    def __next_reconnect_delay(self) -> float:
+        """Exponential backoff with decorrelated jitter: prevents several HA
+        instances from reconnecting LVT server simultaneously"""
+        self.__reconnect_delay = min(
+            RECONNECT_DELAY_MAX,
+            random.uniform(RECONNECT_DELAY_MIN, self.__reconnect_delay * 3),
+        )
+        return self.__reconnect_delay
+
+    async def __async_run_session(self, ws, protocols=None):
+        """Authorize and run session over connected websocket. Session
+        continued with given protocol extensions is not authorized again"""
+        self.__ws = ws
+        self.online = True
+        self.__protocols = set()
+        self.__server_intents_version = None
+        if protocols is not None:
+            self.__set_protocols(list(protocols))
+            self.__authorized = True
+            self.__queue.min_priority = 0
+        else:
+            # Messages are held until LVT server accepts Authorize and
+            # negotiates protocol extensions they are to be encoded with
+            self.__queue.min_priority = PRIORITY_AUTHORIZE
+        if protocols is None and self.password is not None:
+            self.send_message(
+                MSG_API_AUTHORIZE,
+                data=str(self.password),
+                envelope={"Protocols": LVT_PROTOCOLS},
+            )
+        await self.__websock_session(ws)
+
+    async def async_replay(self, ws, protocols=None):
+        """Run session over fake websocket replaying captured frames
+        (see lvt_capture.LvtReplaySocket)"""
+        try:
+            await self.__async_run_session(ws, protocols)
+        finally:
+            self.__ws = None
+            self.online = False
+
+    async def __websock_session(self, ws):
+        """Run connected session: writer task sends queued messages while
+        this (reader) coroutine waits for and processes incoming messages"""
+        session_started = time.time()
+        writer = asyncio.create_task(self.__websock_writer(ws))
+        try:
+            while not ws.closed:
+                # Check if not authorized within AUTHORIZATION_TIMEOUT seconds
+                timeout = None
+                if not self.authorized:
+                    timeout = max(
+                        0, AUTHORIZATION_TIMEOUT - (time.time() - session_started)
+                    )
+                try:
+                    msg = await ws.receive(timeout)
+                except asyncio.TimeoutError:
+                    self.log_error("Not authorized!")
+                    await ws.close()
+                    break
+
+                if msg.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                    # Разбираем пакет, тупо игнорируя ошибки
+                    received = time.monotonic()
+                    if self.__capture is not None:
+                        self.__capture.inbound(msg.data)
+                    try:
+                        request = decode_message(msg.data, self.__protocols)
+                        message = str(request["Message"])
+                        status_code = (
+                            int(request["StatusCode"]) if "StatusCode" in request else 0
+                        )
+                        status = str(request["Status"]) if "Status" in request else None
+                        data = request["Data"] if "Data" in request else None
+                    except Exception:
+                        continue
+                    if self.__metrics.enabled:
+                        self.__metrics.received[message] += 1
+                    if "RequestId" in request:
+                        self.__resolve_request(request)
+                    if message == MSG_API_AUTHORIZE and status_code == 0:
+                        self.__set_protocols(request.get("Protocols"))
+                        self.__server_intents_version = request.get("IntentsVersion")
+                    await self.__async_process_message(
+                        message,
+                        status_code,
+                        status,
+                        data,
+                        received,
+                        request.get("TraceId"),
+                    )
+                elif msg.type in (
+                    aiohttp.WSMsgType.CLOSE,
+                    aiohttp.WSMsgType.CLOSING,
+                    aiohttp.WSMsgType.CLOSED,
+                    aiohttp.WSMsgType.ERROR,
+                ):
+                    break
+        finally:
+            writer.cancel()
+
+    def __set_protocols(self, protocols):
+        """Enable protocol extensions accepted by LVT server"""
+        if isinstance(protocols, list):
+            self.__protocols = {str(p) for p in protocols} & set(LVT_PROTOCOLS)
+        else:
+            self.__protocols = set()
+        if self.__protocols:
+            self.log_debug("Protocol extensions enabled: %s", self.__protocols)
+        if self.__capture is not None:
+            self.__capture.protocols(self.__protocols)
+        if PROTOCOL_REQUESTS not in self.__protocols:
+            self.__reject_requests()
+
+    def __reject_requests(self):
+        """LVT server will not reply to requests: fail pending ones
+        without sending them"""
+        for request_id, future in self.__requests.items():
+            self.__queue.remove_request(request_id)
+            if not future.done():
+                future.set_exception(LvtRequestsNotSupported())
+
+    async def __websock_writer(self, ws):
+        """Send queued messages to LVT server as soon as they are queued"""
+        while True:
+            entry = await self.__queue.async_get()
+            try:
+                frame = encode_message(entry.message, self.__protocols)
+                if isinstance(frame, bytes):
+                    await ws.send_bytes(frame)
+                else:
+                    await ws.send_str(frame)
+            except Exception as ex:
+                # Keep message for the next session and let reader terminate
+                self.__queue.requeue(entry)
+                self.log_warning("Error sending message: %s", str(ex))
+                await ws.close()
+                return
+            if self.__capture is not None:
+                if entry.message["Message"] == MSG_API_AUTHORIZE:
+                    # Do not store password
+                    frame = encode_message(
+                        {**entry.message, "Data": "*"}, self.__protocols
+                    )
+                self.__capture.outbound(frame)
+            if "TraceId" in entry.message:
+                self.tracer.record(
+                    entry.message["TraceId"],
+                    "send",
+                    entry.queued,
+                    message=entry.message["Message"],
+                )
+            if self.__metrics.enabled:
+                self.__metrics.sent[entry.message["Message"]] += 1
+                self.__metrics.send_latency.observe(time.monotonic() - entry.queued)
+            if entry.persistent and self.__outbox_stored:
+                # Drop sent message from storage
+                self.__schedule_outbox_save()
+
+    async def __async_process_message(
+        self,
+        msg: str,
+        status_code: int,
+        status: str,
+        data,
+        received: float = None,
+        trace_id: str = None,
+    ):
+        """Process message received from LVT server (at monotonic time `received`).
+        trace_id is passed by LVT server supporting PROTOCOL_TRACE"""
+        if msg == MSG_API_AUTHORIZE:  # LVT Server status message
+            if status_code == 0:
+                self.log_debug("Authorized")
+                self.__authorized = True
+                self.__queue.min_priority = 0
+                if self.__connect_started is not None:
+                    self.__metrics.auth_time = time.monotonic() - self.__connect_started
+                self.__reconnect_delay = RECONNECT_DELAY_MIN
+                self.send_intents(self.__server_intents_version)
+            else:
+                self.log_error("Authnentication failure: Invalid password.")
+                if self.__ws is not None:
+                    await self.__ws.close()
+
+        if msg == MSG_API_SERVER_STATUS:  # LVT Server status message
+            terminals = data.get("Terminals")
+            # Status without terminal list does not mean terminals are gone
+            if isinstance(terminals, dict):
+                for _, speaker in terminals.items():
+                    await self._async_update_speaker_status(speaker)
+                for speaker_id in self.speakers.keys() - terminals.keys():
+                    await self._async_delete_speaker(speaker_id)
+
+        elif msg == MSG_API_SPEAKER_STATUS:  # Speaker status update
+            for _, speaker in data.items():
+                await self._async_update_speaker_status(speaker)
+
+        elif msg == MSG_API_FIRE_INTENT:
+            if "Intent" not in data:
+                self.log_error("LVT API.FireIntent: Intent not specified ")
+                return
+            intent_type = data["Intent"]
+            intent_data = data["Data"] if "Data" in data else {}
+            intent_data["intent"] = intent_type
+            trace_id = str(trace_id) if trace_id else new_trace_id()
+            intent_data["trace_id"] = trace_id
+
+            intent_importance = data["Importance"] if "Importance" in data else 1
+            intent_speaker = data["Terminal"] if "Terminal" in data else None
+
+            # Intents are handled by worker pool to keep receiving messages
+            if not self.__intent_dispatcher.dispatch(
+                intent_speaker,
+                intent_type,
+                intent_data,
+                intent_importance,
+                intent_speaker,
+                received,
+                trace_id,
+            ):
+                self.log_error(
+                    "Too many intents pending, %s fired by %s dropped",
+                    intent_type,
+                    intent_speaker,
+                )
+        elif msg == MSG_API_ERROR:
+            self.log_error(
+                "LVT Server error #%s: %s",
+                str(status_code),
+                str(status),
+            )
+
+    async def __async_handle_intent(
+        self,
+        intent_type: str,
+        intent_data: dict,
+        intent_importance,
+        intent_speaker,
+        received: float = None,
+        trace_id: str = None,
+    ):
+        """Handle intent fired by LVT server and run triggered automations.
+        received is monotonic time FireIntent message was received"""
+        started = time.monotonic()
+        if received is None:
+            received = started
+        tracer = self.tracer
+        tracer.record(
+            trace_id,
+            "dispatch",
+            received,
+            started,
+            intent=intent_type,
+            terminal=intent_speaker,
+        )
+        # Messages sent by intent handler and triggered automations carry trace id
+        token = current_trace_id.set(trace_id)
+        try:
+            await self.__async_run_intent(
+                intent_type, intent_data, intent_importance, intent_speaker, received
+            )
+        finally:
+            current_trace_id.reset(token)
+            tracer.record(trace_id, "fire_intent", received, intent=intent_type)
+
+    async def __async_run_intent(
+        self,
+        intent_type: str,
+        intent_data: dict,
+        intent_importance,
+        intent_speaker,
+        received: float,
+    ):
+        """Run intent handler replying with speech and triggered automations"""
+        # region Fire An Intent
+        trace_id = current_trace_id.get()
+        slots = {key: {"value": value} for key, value in intent_data.items()}
+        metrics = self.__metrics if self.__metrics.enabled else None
+        started = time.monotonic()
+        try:
+            response = await intent.async_handle(self.hass, DOMAIN, intent_type, slots)
+            self.tracer.record(trace_id, "intent_handler", started)
+            if metrics is not None:
+                metrics.intent_handler_duration.observe(time.monotonic() - started)
+            self.log(str(response))
+
+            if "plain" in response.speech:
+                self.send_message(
+                    MSG_API_SAY,
+                    data={
+                        "Say": response.speech["plain"]["speech"],
+                        "Importance": intent_importance,
+                        "Terminals": [intent_speaker],
+                    },
+                )
+                if metrics is not None:
+                    metrics.intent_reply_latency.observe(time.monotonic() - received)
+
+        except intent.UnknownIntent:
+            self.log_warning("Received unknown intent %s", intent_type)
+
+        except intent.InvalidSlotInfo as err:
+            self.log_error(
+                "Received invalid slot data for intent %s: %s",
+                intent_type,
+                err,
+            )
+
+        except intent.IntentError as e:
+            self.log_error(
+                "Handling request for %s: %s %s",
+                intent_type,
+                type(e).__name__,
+                e,
+            )
+        # endregion
+
+        started = time.monotonic()
+        self.__hub.fire_triggers(
+            intent_type,
+            intent_data,
+            intent_speaker,
+            self.speakers.get(intent_speaker),
+            trace_id,
+        )
+        self.tracer.record(trace_id, "triggers", started)
 
     # endregion
 
@@ -498,7 +1037,7 @@ class LvtApi:
 
     async def _async_update_speaker_status(self, info: dict[str, any]):
         """Update speaker entities with LVT data
-        * Speaker is already registered in HA: update all entities
+        * Speaker is already registered in HA: update entities affected by changes
         * Speaker is online but is not yet registered with HA : create new set of entities
         """
         if not info or not "Id" in info:
@@ -513,8 +1052,9 @@ class LvtApi:
                 speaker = self.speakers[speaker_id]
             else:
                 speaker = self.speakers[speaker_id] = LvtSpeaker(
-                    self.hass, speaker_id, self.online
+                    self.hass, self, speaker_id, self.online
                 )
+                self._async_invalidate_speakers_index()
 
             await speaker.async_update(info)
         except Exception as e:
@@ -530,9 +1070,19 @@ class LvtApi:
         if registry is not None:
             if speaker_id in self.speakers:
                 speaker = self.speakers[speaker_id]
-                if speaker.device is not None:
-                    await registry.async_remove_device(speaker.device.id)
+                device = speaker.device
+                # Never remove device of the same speaker id of another server
+                if device is not None and self.owns_device(device):
+                    registry.async_remove_device(device.id)
                     del self.speakers[speaker_id]
+                    self._async_invalidate_speakers_index()
+
+    def owns_device(self, device) -> bool:
+        """Device registry entry belongs to config entry of this LVT server
+        (devices of LVT server configured in YAML have no config entries)"""
+        if self.config_entry_id is not None:
+            return self.config_entry_id in device.config_entries
+        return not device.config_entries
 
     def create_registered_speakers(self) -> list:
         """Create entities for speakers registered earlier"""
@@ -540,35 +1090,152 @@ class LvtApi:
         registry = self.hass.data["device_registry"]
         if registry is not None:
             for _, device in registry.devices.items():
+                # Speakers of other LVT servers belong to other config entries
+                if not self.owns_device(device):
+                    continue
                 try:
                     l = list(device.identifiers)[0]
                     if len(l) > 1:
-                        domain, speaker_id = l
+                        domain, identifier = l
+                        speaker_id = parse_lvt_speaker_device_id(
+                            self.server_id, identifier
+                        )
+                        if speaker_id is None:
+                            continue
                         if domain == DOMAIN and (speaker_id not in self.speakers):
                             self.speakers[speaker_id] = LvtSpeaker(
-                                self.hass, speaker_id, self.online
+                                self.hass, self, speaker_id, self.online
                             )
                 except Exception:
                     pass
+        self._async_invalidate_speakers_index()
         return ids
 
     # endregion
 
     # region parse_speakers #####################################################
+    @callback
+    def _async_registry_updated(self, _event=None):
+        """HA device, entity or area registry entry of some speaker changed"""
+        self.__speakers_index = None
+        for speaker in self.speakers.values():
+            speaker.invalidate_registry_cache()
+
+    # Registry event filters: changes of registry entries not related to LVT
+    # speakers neither invalidate speaker caches nor rebuild speakers index
+
+    @callback
+    def _device_event_concerns_speakers(self, event) -> bool:
+        device_id = event.data.get("device_id")
+        if event.data.get("action") == "create":
+            # Device of LVT speaker not registered before
+            registry = self.hass.data["device_registry"]
+            device = registry.async_get(device_id) if registry is not None else None
+            return device is not None and any(
+                identifier[0] == DOMAIN for identifier in device.identifiers
+            )
+        return self.__registry_entry_cached(device_id=device_id)
+
+    @callback
+    def _entity_event_concerns_speakers(self, event) -> bool:
+        entity_id = event.data.get("entity_id")
+        old_entity_id = event.data.get("old_entity_id")
+        if self.__registry_entry_cached(entity_id=entity_id) or (
+            old_entity_id is not None
+            and self.__registry_entry_cached(entity_id=old_entity_id)
+        ):
+            return True
+        if event.data.get("action") == "remove":
+            return False
+        # Entity created or moved to speaker device, LVT entity registered
+        registry = self.hass.data["entity_registry"]
+        entry = registry.async_get(entity_id) if registry is not None else None
+        return entry is not None and (
+            entry.platform == DOMAIN
+            or entry.device_id is not None
+            and self.__registry_entry_cached(device_id=entry.device_id)
+        )
+
+    @callback
+    def _area_event_concerns_speakers(self, event) -> bool:
+        return self.__registry_entry_cached(area_id=event.data.get("area_id"))
+
+    def __registry_entry_cached(
+        self, device_id: str = None, entity_id: str = None, area_id: str = None
+    ) -> bool:
+        """Registry entry is cached by some speaker or speakers index"""
+        index = self.__speakers_index
+        if index is not None:
+            # Index is built of registry entries speakers cache and then some
+            return any(
+                key is not None and key in index for key in (device_id, entity_id, area_id)
+            )
+        return any(
+            speaker.caches_registry_entry(device_id, entity_id, area_id)
+            for speaker in self.speakers.values()
+        )
+
+    @callback
+    def _async_invalidate_speakers_index(self, _event=None):
+        """Speakers or HA registries changed: rebuild index on next lookup"""
+        self.__speakers_index = None
+
+    def __get_speakers_index(self) -> dict:
+        """Index of speakers by every id the speaker can be referred by:
+        speaker id, device id, area id, entity id and unique id"""
+        if self.__speakers_index is not None:
+            return self.__speakers_index
+
+        index = {}
+
+        def add(key, speaker):
+            if key:
+                speakers = index.setdefault(str(key), [])
+                if speaker not in speakers:
+                    speakers.append(speaker)
+
+        devices = {}
+        server_id = self.server_id
+        for speaker in self.speakers.values():
+            add(speaker.id, speaker)
+            if server_id is not None:
+                add(speaker.identifier, speaker)
+                # lvt_<server_id>_<speaker_id>_<entity> of entities not registered yet
+                add(speaker.identifier.replace("@", "_"), speaker)
+            for e_id in ("online", "volume", "filter"):
+                add(lvt_unique_id(speaker.id, e_id, server_id), speaker)
+            device = speaker.device
+            if device is not None:
+                add(device.id, speaker)
+                add(device.area_id, speaker)
+                devices[device.id] = speaker
+
+        # Single pass over entity registry rather than lookup per device
+        entity_registry = self.hass.data["entity_registry"]
+        if entity_registry is not None and devices:
+            for entry in entity_registry.entities.values():
+                speaker = devices.get(entry.device_id)
+                if speaker is not None:
+                    add(entry.entity_id, speaker)
+                    add(entry.unique_id, speaker)
+
+        self.__speakers_index = index
+        return index
+
     def parse_speakers(self, speakers, active_only=True):
         """Resolve (list of) speaker IDs. Accepted values are:
         - speaker id
         - HA device id
-        - ID/UID
+        - area id
+        - entity id / unique id of speaker entities
         """
 
-        all_speakers = []
-        for _, speaker in self.speakers.items():
-            if not active_only or speaker.online and speaker.volume > 0:
-                all_speakers.append(speaker)
-
         if not bool(speakers):
-            return all_speakers
+            return [
+                speaker
+                for speaker in self.speakers.values()
+                if not active_only or speaker.connected and speaker.volume > 0
+            ]
 
         if isinstance(speakers, dict):
             speaker_ids = list(speakers.keys())
@@ -577,104 +1244,23 @@ class LvtApi:
         else:
             speaker_ids = [str(speakers)]
 
-        parsed_speakers = []
+        index = self.__get_speakers_index()
+        parsed_speakers = {}
 
         for speaker_id in speaker_ids:
             id1 = str(speaker_id)
+            found = index.get(id1)
+            if found is None:
+                # lvt_<speaker_id>_<entity> of entities not registered yet
+                a = id1.find("lvt_")
+                b = id1.rfind("_")
+                found = index.get(id1[a + 4 : b]) if a >= 0 and b > a + 4 else None
 
-            a = id1.find("lvt_")
-            b = id1.rfind("_")
-            id2 = id1[a + 4 : b] if a >= 0 and b > a + 4 else None
-
-            for speaker in all_speakers:
-                if speaker not in parsed_speakers:
-                    if (
-                        speaker.device is not None
-                        and (
-                            speaker.device.id == str(id1)
-                            or speaker.device.area_id == id1
-                        )
-                        or speaker.id == id1
-                        or speaker.id == id2
-                    ):
-                        parsed_speakers.append(speaker)
-        return parsed_speakers
-
-    # endregion
-
-    # region parse intents ######################################################
-    def __parse_intent(self, parent, icfg):
-        if not isinstance(icfg, dict):
-            self.log_error("LVT config: %s: Invalid intent definition", parent)
-
-        for key in icfg:
-            if key not in ["intent", "speaker", "utterance"]:
-                self.log_error('LVT config: %s: Unknown property "%s" ', parent, key)
-                return None
-
-        if "intent" not in icfg:
-            self.log_error('LVT config: %s: "intent:" property not defined ', parent)
-            return None
-
-        utterance = None
-
-        if "utterance" in icfg:
-            utterance = []
-            if isinstance(icfg["utterance"], str):
-                utterance.append(icfg["utterance"])
-
-            elif isinstance(icfg["utterance"], list):
-                for u in icfg["utterance"]:
-                    utterance.append(str(u))
-            if len(utterance) == 0:
-                self.log_error(
-                    'LVT config: %s: "utterance" should be the (list of) phases',
-                    parent,
-                )
-                return None
-        else:
-            self.log_error('LVT config: %s: "utterance" not defined', parent)
-            return None
-
-        if "speaker" in icfg:
-            speakers = icfg["speaker"]
-            if isinstance(speakers, dict):
-                speakers = [str(speaker).lower() for speaker in speakers.keys()]
-            elif isinstance(speakers, list):
-                speakers = [str(speaker).lower() for speaker in speakers]
-            else:
-                speakers = [str(speakers).lower()]
-        else:
-            speakers = []
-
-        return {
-            "Intent": str(icfg["intent"]),
-            "Terminals": speakers,
-            "Utterance": utterance,
-        }
+            for speaker in found or ():
+                if not active_only or speaker.connected and speaker.volume > 0:
+                    parsed_speakers[speaker.id] = speaker
 
-    def parse_intents(self, config) -> bool:
-        """Parse intent definition from YAML config"""
-        if not isinstance(config, dict):
-            self.log_error("Invalid configuration file passed")
-            return False
-        errors = 0
-        # intents = []
-        for key, cfg in config.items():
-            if str(key).lower().startswith("intents"):
-                if isinstance(cfg, list):
-                    for i in range(len(cfg)):
-                        intnt = self.__parse_intent(f"lvt => {key}[{i}]", cfg[i])
-                        if intnt is not None:
-                            self.__intents.append(intnt)
-                        else:
-                            errors += 1
-                else:
-                    self.log_error(
-                        'LVT Config parser: Section "%s" should have list of intents',
-                        key,
-                    )
-        return True
+        return list(parsed_speakers.values())
 
     # endregion
 
@@ -696,8 +1282,6 @@ class LvtApi:
     # region handle_play ########################################################
     async def handle_play(self, call):
         """Handle "play" service call"""
-        if not self.online:
-            return
         sound = str(call.data.get("play", ""))
         importance = self.get_call_importance(call)
         speakers = self.get_call_speakers(call)
@@ -711,9 +1295,10 @@ class LvtApi:
 
         self.synchronize_speakers()
 
-        self.send_message(
+        return await self.__async_call_server(
+            call,
             MSG_API_PLAY,
-            data={
+            {
                 "Sound": sound,
                 "Importance": importance,
                 "Terminals": speakers,
@@ -726,8 +1311,6 @@ class LvtApi:
     # region handle_say #########################################################
     async def handle_say(self, call):
         """Handle "say" service call."""
-        if not self.online:
-            return
         text = call.data.get("say", "")
         importance = self.get_call_importance(call)
         speakers = self.get_call_speakers(call)
@@ -742,9 +1325,10 @@ class LvtApi:
 
         self.synchronize_speakers()
 
-        self.send_message(
+        return await self.__async_call_server(
+            call,
             MSG_API_SAY,
-            data={
+            {
                 "Say": text,
                 "Importance": importance,
                 "Terminals": speakers,
@@ -757,8 +1341,6 @@ class LvtApi:
     # region handle_confirm #####################################################
     async def handle_confirm(self, call):
         """Handle "confirm" service call."""
-        if not self.online:
-            return
         say = call.data.get("say", None)
         importance = self.get_call_importance(call)
         speakers = self.get_call_speakers(call)
@@ -800,9 +1382,10 @@ class LvtApi:
             }
         )
 
-        self.send_message(
+        return await self.__async_call_server(
+            call,
             MSG_API_NEGOTIATE,
-            data={
+            {
                 "Say": say,
                 "Importance": importance,
                 "Volume": call.data.get("volume", None),
@@ -821,8 +1404,6 @@ class LvtApi:
     # region handle_negotiate ###################################################
     async def handle_negotiate(self, call):
         """Handle "say" service call."""
-        if not self.online:
-            return
         say = call.data.get("say", None)
         importance = self.get_call_importance(call)
         speakers = self.get_call_speakers(call)
@@ -874,15 +1455,13 @@ class LvtApi:
             "DefaultTimeout": call.data.get("default_timeout", None),
             "DefaultUtterance": call.data.get("default_utterance", None),
         }
-        self.send_message(MSG_API_NEGOTIATE, data=data)
+        return await self.__async_call_server(call, MSG_API_NEGOTIATE, data)
 
     # endregion
 
     # region handle_listening_start / handle_listening_stop #####################
     async def handle_listening_start(self, call):
         """Handle "listening_start" service call."""
-        if not self.online:
-            return
         speakers = self.get_call_speakers(call)
         importance = self.get_call_importance(call)
         if not bool(call.data.get("say", None)):
@@ -913,12 +1492,10 @@ class LvtApi:
             "DefaultIntent": call.data.get("default_intent", None),
             "DefaultTimeout": call.data.get("default_timeout", None),
         }
-        self.send_message(MSG_API_LISTENING_START, data=data)
+        return await self.__async_call_server(call, MSG_API_LISTENING_START, data)
 
     async def handle_listening_stop(self, call):
         """Handle "listening_stop" service call."""
-        if not self.online:
-            return
         speakers = self.parse_speakers(call.data.get("speaker", None), True)
         speakerIds = [speaker.id for speaker in speakers]
 
@@ -934,15 +1511,13 @@ class LvtApi:
             "Importance": 2,
             "Terminals": speakerIds,
         }
-        self.send_message(MSG_API_LISTENING_STOP, data=data)
+        return await self.__async_call_server(call, MSG_API_LISTENING_STOP, data)
 
     # endregion
 
     # region handle_restart #####################################################
     async def handle_restart(self, call):
         """Handle "say" service call."""
-        if not self.online:
-            return
         speakers = self.parse_speakers(
             call.data.get("speaker", None), active_only=False
         )
@@ -1006,13 +1581,12 @@ async def async_server_test(
             ssl=get_ssl_context(ssl_mode),
         ) as ws:
             if password is not None:
-                request = {}
-                request["Message"] = MSG_API_AUTHORIZE
-                request["Data"] = json.dumps(password)
-                await ws.send_json(request)
+                await ws.send_str(
+                    encode_message({"Message": MSG_API_AUTHORIZE, "Data": password})
+                )
 
             msg = await ws.receive(5)
-            request = json.loads(str(msg.data))
+            request = decode_message(msg.data)
             msg = str(request["Message"])
             status_code = int(request["StatusCode"]) if "StatusCode" in request else 0
             if msg == MSG_API_AUTHORIZE and (status_code == 0):
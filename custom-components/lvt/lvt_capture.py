@@ -0,0 +1,297 @@
+"""Lite Voice Terminal - capture and replay of LVT server websocket sessions
+
+Capture file starts with CAPTURE_MAGIC followed by records:
+    <time: float64> <direction: uint8> <kind: uint8> <length: uint32> <payload>
+Text frames are stored UTF-8 encoded, binary (compressed) frames as is.
+File started in the middle of a session (rotated) begins with
+CAPTURE_RESUME record so it can be replayed on its own.
+"""
+
+import asyncio
+import logging
+import os
+import struct
+import time
+from typing import NamedTuple
+
+import aiohttp
+
+from .lvt_codec import json_dumps, json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"LVTCAP1\n"
+CAPTURE_RECORD = struct.Struct("<dBBI")
+
+# Record directions
+CAPTURE_INBOUND = 0
+CAPTURE_OUTBOUND = 1
+# Connected to LVT server, payload is server URL
+CAPTURE_CONNECT = 2
+# Protocol extensions enabled, payload is JSON list
+CAPTURE_PROTOCOLS = 3
+# Session continued from the previous file, payload is JSON {"Url", "Protocols"}
+CAPTURE_RESUME = 4
+
+CAPTURE_TEXT = 0
+CAPTURE_BINARY = 1
+
+# Default maximal capture file size (bytes) and number of rotated files kept
+CAPTURE_MAX_BYTES = 10 * 1024 * 1024
+CAPTURE_BACKUPS = 3
+# Delay (seconds) to collect frames before writing them to the file
+CAPTURE_FLUSH_DELAY = 1
+# Frames are dropped while this much data (bytes) is waiting to be written
+CAPTURE_BUFFER_LIMIT = 4 * 1024 * 1024
+
+
+class CaptureRecord(NamedTuple):
+    """Captured frame or connection event"""
+
+    time: float
+    direction: int
+    data: object
+
+
+def encode_record(direction: int, frame, timestamp: float = None) -> bytes:
+    """Encode capture record"""
+    if isinstance(frame, str):
+        kind, payload = CAPTURE_TEXT, frame.encode("utf-8")
+    else:
+        kind, payload = CAPTURE_BINARY, bytes(frame)
+    return (
+        CAPTURE_RECORD.pack(
+            time.time() if timestamp is None else timestamp,
+            direction,
+            kind,
+            len(payload),
+        )
+        + payload
+    )
+
+
+def read_capture(path: str):
+    """Iterate records of capture file. Truncated last record is ignored"""
+    with open(path, "rb") as file:
+        if file.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"{path} is not LVT capture file")
+        while True:
+            header = file.read(CAPTURE_RECORD.size)
+            if len(header) < CAPTURE_RECORD.size:
+                return
+            timestamp, direction, kind, length = CAPTURE_RECORD.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length:
+                return
+            yield CaptureRecord(
+                timestamp,
+                direction,
+                payload.decode("utf-8") if kind == CAPTURE_TEXT else payload,
+            )
+
+
+class LvtCapture:
+    """Appends websocket frames to capture file. Frames are buffered and
+    written by executor job, file is rotated once it exceeds max_bytes"""
+
+    def __init__(
+        self,
+        hass,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        self.hass = hass
+        self.path = path
+        self.__max_bytes = max_bytes
+        self.__backups = backups
+        self.__buffer = []
+        self.__buffered = 0
+        self.__dropped = 0
+        self.__url = None
+        self.__resume = b""
+        self.__buffer_resume = b""
+        self.__handle = None
+        self.__task = None
+
+    def connected(self, url: str) -> None:
+        """Record new connection to LVT server"""
+        self.__url = url
+        self.__set_resume([])
+        self.__append(encode_record(CAPTURE_CONNECT, url))
+
+    def protocols(self, protocols) -> None:
+        """Record protocol extensions enabled"""
+        protocols = sorted(protocols)
+        self.__set_resume(protocols)
+        self.__append(encode_record(CAPTURE_PROTOCOLS, json_dumps(protocols)))
+
+    def __set_resume(self, protocols: list) -> None:
+        self.__resume = encode_record(
+            CAPTURE_RESUME, json_dumps({"Url": self.__url, "Protocols": protocols})
+        )
+
+    def inbound(self, frame) -> None:
+        """Record frame received from LVT server"""
+        self.__append(encode_record(CAPTURE_INBOUND, frame))
+
+    def outbound(self, frame) -> None:
+        """Record frame sent to LVT server"""
+        self.__append(encode_record(CAPTURE_OUTBOUND, frame))
+
+    def close(self) -> None:
+        """Write buffered frames and stop capturing"""
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+        self.__start_flush()
+
+    def __append(self, record: bytes) -> None:
+        if self.__buffered > CAPTURE_BUFFER_LIMIT:
+            self.__dropped += 1
+            return
+        if not self.__buffer:
+            # Connection state as of the first buffered record
+            self.__buffer_resume = self.__resume
+        self.__buffer.append(record)
+        self.__buffered += len(record)
+        if self.__handle is None and self.__task is None:
+            self.__handle = self.hass.loop.call_later(
+                CAPTURE_FLUSH_DELAY, self.__start_flush
+            )
+
+    def __start_flush(self) -> None:
+        self.__handle = None
+        if self.__task is None and self.__buffer:
+            self.__task = self.hass.async_create_task(self.__async_flush())
+
+    async def __async_flush(self) -> None:
+        """Write buffered records one chunk at a time to keep their order"""
+        try:
+            while self.__buffer:
+                chunk = b"".join(self.__buffer)
+                resume = self.__buffer_resume
+                self.__buffer = []
+                self.__buffered = 0
+                if self.__dropped:
+                    _LOGGER.warning(
+                        "%s frames not captured: %s is too slow",
+                        self.__dropped,
+                        self.path,
+                    )
+                    self.__dropped = 0
+                await self.hass.async_add_executor_job(
+                    self.__write, chunk, resume
+                )
+        except OSError as ex:
+            _LOGGER.error("Error writing %s: %s", self.path, str(ex))
+        finally:
+            self.__task = None
+
+    def __write(self, chunk: bytes, resume: bytes) -> None:
+        """Append chunk to capture file rotating it if required (executor)"""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size > len(CAPTURE_MAGIC) and size + len(chunk) > self.__max_bytes:
+            self.__rotate()
+            size = 0
+        with open(self.path, "ab") as file:
+            if size == 0:
+                file.write(CAPTURE_MAGIC)
+                # Connection state of the session continued in the new file
+                if CAPTURE_RECORD.unpack_from(chunk)[1] != CAPTURE_CONNECT:
+                    file.write(resume)
+            file.write(chunk)
+
+    def __rotate(self) -> None:
+        for i in range(self.__backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.__backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+# region replay ################################################################
+class CaptureSession(NamedTuple):
+    """Captured session. Resumed session was authorized and negotiated
+    protocol extensions before the capture file started"""
+
+    url: str
+    protocols: list
+    resumed: bool
+    inbound: list
+
+
+def split_sessions(records) -> list:
+    """Split capture records into sessions (CaptureSession)"""
+    sessions = []
+    for record in records:
+        if record.direction == CAPTURE_CONNECT:
+            sessions.append(CaptureSession(record.data, [], False, []))
+        elif record.direction == CAPTURE_RESUME:
+            state = json_loads(record.data)
+            sessions.append(
+                CaptureSession(state.get("Url"), state.get("Protocols") or [], True, [])
+            )
+        elif record.direction == CAPTURE_INBOUND:
+            if not sessions:
+                sessions.append(CaptureSession(None, [], True, []))
+            sessions[-1].inbound.append(record)
+    return sessions
+
+
+class LvtReplaySocket:
+    """Fake websocket feeding captured inbound frames to LvtApi session.
+    speed is replay speed relative to recorded one (0: as fast as possible).
+    Once frames are over socket waits `linger` seconds for replies and closes"""
+
+    def __init__(self, records: list, speed: float = 1.0, linger: float = 1.0):
+        self.__records = records
+        self.__speed = speed
+        self.__linger = linger
+        self.__position = 0
+        self.__started = None
+        self.closed = False
+        self.sent = []
+        self.finished = None
+
+    async def receive(self, timeout: float = None) -> aiohttp.WSMessage:
+        """Next captured frame, at recorded time if replayed at given speed"""
+        if self.__position >= len(self.__records):
+            if self.finished is None:
+                self.finished = time.monotonic()
+                await asyncio.sleep(self.__linger)
+            self.closed = True
+            return aiohttp.WSMessage(aiohttp.WSMsgType.CLOSED, None, None)
+
+        record = self.__records[self.__position]
+        self.__position += 1
+        if self.__started is None:
+            self.__started = (time.monotonic(), record.time)
+        if self.__speed > 0:
+            delay = self.__started[0] + (
+                record.time - self.__started[1]
+            ) / self.__speed - time.monotonic()
+            await asyncio.sleep(max(0, delay))
+        else:
+            # Let writer and intent workers run
+            await asyncio.sleep(0)
+        if isinstance(record.data, str):
+            return aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, record.data, None)
+        return aiohttp.WSMessage(aiohttp.WSMsgType.BINARY, record.data, None)
+
+    async def send_str(self, frame: str) -> None:
+        self.sent.append(frame)
+
+    async def send_bytes(self, frame: bytes) -> None:
+        self.sent.append(frame)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+# endregion
@@ -0,0 +1,44 @@
+"""Lite Voice Terminal - JSON codec used for LVT API messages.
+
+orjson is used if installed (it is shipped with Home Assistant),
+standard json module is used otherwise.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+if orjson is not None:
+    JSON_BACKEND = "orjson"
+
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize object to UTF-8 encoded JSON"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def json_dumps(obj) -> str:
+        """Serialize object to JSON string"""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def json_loads(data):
+        """Deserialize JSON string or UTF-8 encoded bytes"""
+        return orjson.loads(data)
+
+else:
+    JSON_BACKEND = "json"
+    _ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+    def json_dumps_bytes(obj) -> bytes:
+        """Serialize object to UTF-8 encoded JSON"""
+        return _ENCODER.encode(obj).encode("utf-8")
+
+    def json_dumps(obj) -> str:
+        """Serialize object to JSON string"""
+        return _ENCODER.encode(obj)
+
+    def json_loads(data):
+        """Deserialize JSON string or UTF-8 encoded bytes"""
+        return json.loads(data)
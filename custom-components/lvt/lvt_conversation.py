@@ -0,0 +1,71 @@
+"""Lite Voice Terminal - conversation agent matching LVT intents locally"""
+import logging
+
+from homeassistant.components import conversation
+from homeassistant.const import MATCH_ALL
+from homeassistant.helpers import intent
+from homeassistant.helpers.typing import HomeAssistantType
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LvtConversationAgent(conversation.AbstractConversationAgent):
+    """Conversation agent matching text against utterance templates of LVT intents.
+    Matching does not depend on LVT server so the agent works while server is offline.
+    Intents bound to particular speakers are not matched"""
+
+    def __init__(self, hass: HomeAssistantType, hub) -> None:
+        self.hass = hass
+        self.__hub = hub
+
+    @property
+    def supported_languages(self) -> list[str]:
+        """Language depends on utterance templates configured"""
+        return MATCH_ALL
+
+    async def async_process(
+        self, user_input: conversation.ConversationInput
+    ) -> conversation.ConversationResult:
+        """Fire intent matching user input and run triggered automations"""
+        match = self.__hub.matcher.match(user_input.text)
+        if match is None:
+            response = intent.IntentResponse(language=user_input.language)
+            response.async_set_error(
+                intent.IntentResponseErrorCode.NO_INTENT_MATCH,
+                "Sorry, I couldn't understand that",
+            )
+            return conversation.ConversationResult(
+                response=response, conversation_id=user_input.conversation_id
+            )
+
+        intent_type, intent_data = match
+        intent_data = {**intent_data, "intent": intent_type, "text": user_input.text}
+        slots = {key: {"value": value} for key, value in intent_data.items()}
+        try:
+            response = await intent.async_handle(
+                self.hass,
+                DOMAIN,
+                intent_type,
+                slots,
+                user_input.text,
+                user_input.context,
+                user_input.language,
+            )
+        except intent.UnknownIntent:
+            # Intent may be handled by automations only
+            response = intent.IntentResponse(language=user_input.language)
+        except intent.IntentError as ex:
+            _LOGGER.error(
+                "Handling request for %s: %s %s", intent_type, type(ex).__name__, ex
+            )
+            response = intent.IntentResponse(language=user_input.language)
+            response.async_set_error(
+                intent.IntentResponseErrorCode.FAILED_TO_HANDLE, str(ex)
+            )
+
+        self.__hub.fire_triggers(intent_type, intent_data, None)
+        return conversation.ConversationResult(
+            response=response, conversation_id=user_input.conversation_id
+        )
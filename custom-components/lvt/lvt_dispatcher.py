@@ -0,0 +1,115 @@
+"""Lite Voice Terminal - intent dispatcher"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+_LOGGER = logging.getLogger(__name__)
+
+# Number of intents handled concurrently
+INTENT_WORKERS = 4
+# Maximal number of intents waiting to be handled
+INTENT_QUEUE_SIZE = 64
+# Time (seconds) allowed to handle an intent
+INTENT_DEADLINE = 30
+
+
+class LvtIntentDispatcher:
+    """Bounded pool of workers handling intents fired by LVT server:
+    * Intents fired by the same terminal are handled in the order they were fired
+    * Intents of different terminals are handled concurrently, up to `workers` at once
+    * Intent handling is cancelled if it takes longer than `deadline` seconds
+    * New intents are dropped while `maxsize` intents are waiting
+    """
+
+    def __init__(
+        self,
+        hass,
+        handler,
+        workers: int = INTENT_WORKERS,
+        maxsize: int = INTENT_QUEUE_SIZE,
+        deadline: float = INTENT_DEADLINE,
+    ) -> None:
+        self.hass = hass
+        self.__handler = handler
+        self.__semaphore = asyncio.Semaphore(workers)
+        self.__maxsize = maxsize
+        self.__deadline = deadline
+        self.__queues = {}
+        self.__tasks = {}
+        self.__pending = 0
+        self.__stats = {
+            "max_pending": 0,
+            "handled": 0,
+            "dropped": 0,
+            "timed_out": 0,
+            "failed": 0,
+            "max_wait": 0.0,
+        }
+
+    @property
+    def pending(self) -> int:
+        """Number of intents waiting to be handled"""
+        return self.__pending
+
+    @property
+    def stats(self) -> dict:
+        """Backpressure counters"""
+        return {"pending": self.__pending, **self.__stats}
+
+    def dispatch(self, terminal, *args) -> bool:
+        """Queue handler(*args) call. Returns False if queue is full"""
+        if self.__pending >= self.__maxsize:
+            self.__stats["dropped"] += 1
+            return False
+
+        self.__queues.setdefault(terminal, deque()).append((time.monotonic(), args))
+        self.__pending += 1
+        self.__stats["max_pending"] = max(self.__stats["max_pending"], self.__pending)
+        if terminal not in self.__tasks:
+            self.__tasks[terminal] = self.hass.async_create_task(
+                self.__async_worker(terminal)
+            )
+        return True
+
+    def stop(self):
+        """Cancel intents being handled and drop pending ones"""
+        for task in self.__tasks.values():
+            task.cancel()
+        self.__tasks.clear()
+        self.__queues.clear()
+        self.__pending = 0
+
+    async def __async_worker(self, terminal):
+        """Handle intents fired by terminal one by one"""
+        queue = self.__queues[terminal]
+        try:
+            while queue:
+                async with self.__semaphore:
+                    queued, args = queue.popleft()
+                    self.__pending -= 1
+                    wait = time.monotonic() - queued
+                    self.__stats["max_wait"] = max(self.__stats["max_wait"], wait)
+                    try:
+                        await asyncio.wait_for(self.__handler(*args), self.__deadline)
+                        self.__stats["handled"] += 1
+                    except asyncio.TimeoutError:
+                        self.__stats["timed_out"] += 1
+                        _LOGGER.error(
+                            "Intent handling for terminal %s exceeded %s seconds",
+                            terminal,
+                            self.__deadline,
+                        )
+                    except Exception as ex:
+                        self.__stats["failed"] += 1
+                        _LOGGER.error(
+                            "Error [%s] handling intent for terminal %s: %s",
+                            type(ex).__name__,
+                            terminal,
+                            str(ex),
+                        )
+        finally:
+            if self.__queues.get(terminal) is queue:
+                del self.__queues[terminal]
+                self.__tasks.pop(terminal, None)
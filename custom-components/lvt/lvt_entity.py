@@ -1,3 +1,4 @@
+from homeassistant.core import callback
 from homeassistant.helpers.entity import Entity
 
 from .const import (
@@ -6,20 +7,69 @@ from .const import (
 )
 
 
+class LvtStateWriter:
+    """Collects LVT entities with changed state and writes their states
+    to HA once per event loop iteration"""
+
+    def __init__(self, hass) -> None:
+        self.hass = hass
+        self.__dirty = {}
+        self.__handle = None
+
+    @callback
+    def schedule(self, entity: Entity) -> None:
+        """Write entity state on the next event loop iteration"""
+        self.__dirty[entity] = None
+        if self.__handle is None:
+            self.__handle = self.hass.loop.call_soon(self.__flush)
+
+    @callback
+    def discard(self, entity: Entity) -> None:
+        """Forget pending state write of removed entity"""
+        self.__dirty.pop(entity, None)
+
+    @callback
+    def cancel(self) -> None:
+        """Drop pending state writes"""
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+        self.__dirty.clear()
+
+    @callback
+    def __flush(self) -> None:
+        self.__handle = None
+        entities, self.__dirty = self.__dirty, {}
+        for entity in entities:
+            # Entity not yet added to HA will write its state when added
+            if entity.platform is not None and entity.enabled:
+                entity.async_write_ha_state()
+
+
 class LvtEntity(Entity):
     """LVT Entity base class."""
 
-    def __init__(self, hass, lvt_speaker, e_id: str):
+    def __init__(self, hass, lvt_api, lvt_speaker, e_id: str):
         """Initialize LVT Speaker Online sensor"""
         self._attr_should_poll = False
         self._disabled_reported = True
         self._attr_state = None
         self.hass = hass
+        self._attr_lvt_api = lvt_api
         self._attr_speaker = lvt_speaker
         self._attr_available = False
 
-        self.entity_id = lvt_entity_id(self.speaker_id, e_id)
-        self._attr_unique_id = lvt_unique_id(self.speaker_id, e_id)
+        server_id = lvt_api.server_id
+        if lvt_speaker is None and server_id is not None:
+            # LVT server entity: distinguish entities of several servers
+            e_id = f"{server_id}_{e_id}"
+        # Speaker entities get server_id namespace from lvt_unique_id()
+        self.entity_id = lvt_entity_id(self.speaker_id, e_id, server_id)
+        self._attr_unique_id = lvt_unique_id(self.speaker_id, e_id, server_id)
+
+    @property
+    def lvt_api(self):
+        return self._attr_lvt_api
 
     @property
     def speaker_id(self) -> str:
@@ -33,11 +83,20 @@ class LvtEntity(Entity):
     def device_info(self):
         if self.speaker is not None:
             return self.speaker.device_info
-        return None
+        return self.lvt_api.device_info
 
     def set_online(self, is_online: bool):
         if self.enabled:
             updated = bool(self._attr_available != is_online)
             self._attr_available = is_online
             if updated:
-                self.schedule_update_ha_state()
+                self.schedule_state_write()
+
+    @callback
+    def schedule_state_write(self):
+        """Write entity state along with other LVT entities changed
+        within the same event loop iteration"""
+        self.lvt_api.state_writer.schedule(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.lvt_api.state_writer.discard(self)
@@ -0,0 +1,404 @@
+"""Lite Voice Terminal - hub of LVT server connections"""
+import asyncio
+import hashlib
+import logging
+
+from homeassistant.components import conversation
+from homeassistant.core import CALLBACK_TYPE, HassJob, SupportsResponse, callback
+from homeassistant.helpers.typing import HomeAssistantType
+
+from .const import CONF_INTENT, DOMAIN
+from .lvt_codec import json_dumps_bytes
+from .lvt_conversation import LvtConversationAgent
+from .lvt_entity import LvtStateWriter
+from .lvt_matcher import LvtIntentMatcher
+from .lvt_utterance import UtteranceError, compile_utterance
+
+_LOGGER = logging.getLogger(__name__)
+
+# Service name => LvtApi service handler
+LVT_SERVICES = {
+    "play": "handle_play",
+    "say": "handle_say",
+    "confirm": "handle_confirm",
+    "negotiate": "handle_negotiate",
+    "listening_start": "handle_listening_start",
+    "listening_stop": "handle_listening_stop",
+    "restart_speaker": "handle_restart",
+}
+
+
+def normalize_intent(intent_type) -> str:
+    """Intent name used to match triggers"""
+    return str(intent_type).strip().lower()
+
+
+def intent_key(intnt: dict) -> str:
+    """Intents with the same name and speakers are the same intent"""
+    return f"{intnt['Intent']}@{','.join(sorted(intnt['Terminals']))}"
+
+
+def intents_version(intents: dict) -> str:
+    """Content hash of intents (does not depend on intents order)"""
+    digest = hashlib.sha1()
+    for key in sorted(intents):
+        digest.update(json_dumps_bytes(intents[key]))
+    return digest.hexdigest()
+
+
+def utterance_vocabulary(utterance: list) -> frozenset:
+    """Words to be recognized by LVT server for the list of utterances"""
+    return frozenset().union(*(compile_utterance(u).vocabulary for u in utterance))
+
+
+class LvtHub:
+    """Set of LVT server connections (LvtApi) sharing intents, triggers and services.
+    Every LvtApi owns speakers (terminals) connected to its LVT server"""
+
+    # region __init__ / unload ##################################################
+    def __init__(self, hass: HomeAssistantType) -> None:
+        """Constructor"""
+        self.hass: HomeAssistantType = hass
+        self.__apis = {}
+        self.__triggers = {}
+        self.__trigger_id = 0
+        self.__intents = {}
+        self.__intents_version = intents_version(self.__intents)
+        self.__matcher = None
+        self.__state_writer = LvtStateWriter(hass)
+        self.__agent = LvtConversationAgent(hass, self)
+        self.__agent_owner = None
+        self.yaml_configured = False
+        for service, handler in LVT_SERVICES.items():
+            hass.services.async_register(
+                DOMAIN,
+                service,
+                getattr(self, handler),
+                supports_response=SupportsResponse.OPTIONAL,
+            )
+
+    def unload(self):
+        """Stop all LVT API clients and unregister services"""
+        for api in self.__apis.values():
+            api.unload()
+        self.__apis.clear()
+        self.__set_agent_owner(None)
+        self.__state_writer.cancel()
+        for service in LVT_SERVICES:
+            self.hass.services.async_remove(DOMAIN, service)
+
+    @property
+    def state_writer(self) -> LvtStateWriter:
+        """Entity state writes batcher shared by all LVT servers"""
+        return self.__state_writer
+
+    # endregion
+
+    # region apis / add_api / remove_api ########################################
+    @property
+    def apis(self) -> dict:
+        """LVT API clients by key (config entry id or LVT_YAML_API)"""
+        return self.__apis
+
+    def add_api(self, key: str, api):
+        """Register LVT API client"""
+        self.__apis[key] = api
+        self.update_agent()
+
+    def remove_api(self, key: str):
+        """Unload and unregister LVT API client"""
+        api = self.__apis.pop(key, None)
+        if api is not None:
+            api.unload()
+        self.update_agent()
+
+    # endregion
+
+    # region conversation agent #################################################
+    @callback
+    def update_agent(self):
+        """Register single conversation agent shared by all LVT servers.
+        HA lists conversation agents by config entry, so the agent is
+        registered under config entry of some LVT server (none if LVT
+        is configured in YAML only)"""
+        owner = None
+        for api in self.__apis.values():
+            if api.config_entry_id is not None:
+                owner = self.hass.config_entries.async_get_entry(api.config_entry_id)
+                if owner is not None:
+                    break
+        self.__set_agent_owner(owner)
+
+    def __set_agent_owner(self, owner):
+        if owner is self.__agent_owner:
+            return
+        if self.__agent_owner is not None:
+            conversation.async_unset_agent(self.hass, self.__agent_owner)
+        self.__agent_owner = owner
+        if owner is not None:
+            conversation.async_set_agent(self.hass, owner, self.__agent)
+
+    @property
+    def intents(self) -> dict:
+        """Intents configured in YAML, shared by all LVT servers, by intent_key().
+        Dictionary is replaced (never modified) when intents are reloaded"""
+        return self.__intents
+
+    @property
+    def intents_version(self) -> str:
+        """Content hash of intents"""
+        return self.__intents_version
+
+    @property
+    def matcher(self) -> LvtIntentMatcher:
+        """Local matcher of intents not bound to particular speakers"""
+        if self.__matcher is None:
+            self.__matcher = LvtIntentMatcher(
+                intnt for intnt in self.__intents.values() if not intnt["Terminals"]
+            )
+        return self.__matcher
+
+    @property
+    def intents_vocabulary(self) -> dict:
+        """Vocabulary size by intent key"""
+        return {
+            ikey: len(utterance_vocabulary(intnt["Utterance"]))
+            for ikey, intnt in self.__intents.items()
+        }
+
+    # endregion
+
+    # region triggers ###########################################################
+    def add_trigger(
+        self, config, action, automation, speaker_filter=None, data_filter=None
+    ) -> CALLBACK_TYPE:
+        """Register trigger to track. Returns callback unregistering the trigger.
+        speaker_filter: set of speaker/device/area ids trigger is limited to
+        data_filter: predicate on intent data"""
+        intent_key = normalize_intent(config[CONF_INTENT])
+        self.__trigger_id += 1
+        trigger_id = self.__trigger_id
+        triggers = self.__triggers.setdefault(intent_key, {})
+        triggers[trigger_id] = {
+            "job": HassJob(action),
+            "trigger_data": automation["trigger_data"],
+            "speakers": speaker_filter,
+            "data": data_filter,
+        }
+
+        @callback
+        def async_remove() -> None:
+            """Unregister trigger"""
+            triggers = self.__triggers.get(intent_key)
+            if triggers is not None:
+                triggers.pop(trigger_id, None)
+                if not triggers:
+                    del self.__triggers[intent_key]
+
+        return async_remove
+
+    def fire_triggers(
+        self,
+        intent_type: str,
+        intent_data: dict,
+        intent_speaker,
+        speaker=None,
+        trace_id: str = None,
+    ):
+        """Run automations triggered by intent fired by speaker (LvtSpeaker)"""
+        triggers = self.__triggers.get(normalize_intent(intent_type))
+        if not triggers:
+            return
+        aliases = None
+        for trigger in list(triggers.values()):
+            if trigger["speakers"] is not None:
+                if aliases is None:
+                    aliases = (
+                        speaker.aliases
+                        if speaker is not None
+                        else {str(intent_speaker).lower()}
+                    )
+                if trigger["speakers"].isdisjoint(aliases):
+                    continue
+            if trigger["data"] is not None and not trigger["data"](intent_data):
+                continue
+            self.hass.async_run_hass_job(
+                trigger["job"],
+                {
+                    "trigger": {
+                        **trigger["trigger_data"],
+                        "platform": DOMAIN,
+                        "intent": intent_type,
+                        "data": intent_data,
+                        "trace_id": trace_id,
+                        "description": f'Intent "{intent_type}" fired by "{intent_speaker}"',
+                    }
+                },
+                None,
+            )
+
+    # endregion
+
+    # region parse intents ######################################################
+    def __parse_intent(self, parent, icfg):
+        if not isinstance(icfg, dict):
+            _LOGGER.error("LVT config: %s: Invalid intent definition", parent)
+            return None
+
+        for key in icfg:
+            if key not in ["intent", "speaker", "utterance"]:
+                _LOGGER.error('LVT config: %s: Unknown property "%s" ', parent, key)
+                return None
+
+        if "intent" not in icfg:
+            _LOGGER.error('LVT config: %s: "intent:" property not defined ', parent)
+            return None
+
+        utterance = None
+
+        if "utterance" in icfg:
+            utterance = []
+            if isinstance(icfg["utterance"], str):
+                utterance.append(icfg["utterance"])
+
+            elif isinstance(icfg["utterance"], list):
+                for u in icfg["utterance"]:
+                    utterance.append(str(u))
+            try:
+                compiled = [compile_utterance(u) for u in utterance]
+            except UtteranceError as ex:
+                _LOGGER.error("LVT config: %s: %s", parent, str(ex))
+                return None
+            # Normalized templates, duplicates removed
+            utterance = list(dict.fromkeys(c.text for c in compiled))
+            if len(utterance) == 0:
+                _LOGGER.error(
+                    'LVT config: %s: "utterance" should be the (list of) phases',
+                    parent,
+                )
+                return None
+        else:
+            _LOGGER.error('LVT config: %s: "utterance" not defined', parent)
+            return None
+
+        if "speaker" in icfg:
+            speakers = icfg["speaker"]
+            if isinstance(speakers, dict):
+                speakers = [str(speaker).lower() for speaker in speakers.keys()]
+            elif isinstance(speakers, list):
+                speakers = [str(speaker).lower() for speaker in speakers]
+            else:
+                speakers = [str(speakers).lower()]
+        else:
+            speakers = []
+
+        return {
+            "Intent": str(icfg["intent"]),
+            "Terminals": speakers,
+            "Utterance": utterance,
+        }
+
+    def parse_intents(self, config) -> bool:
+        """Parse intent definition from YAML config. Replaces previously parsed
+        intents and pushes changes to connected LVT servers.
+        Returns False (intents are not changed) if any intent is invalid"""
+        if not isinstance(config, dict):
+            _LOGGER.error("Invalid configuration file passed")
+            return False
+        errors = 0
+        intents = {}
+        for key, cfg in config.items():
+            if str(key).lower().startswith("intents"):
+                if isinstance(cfg, list):
+                    for i in range(len(cfg)):
+                        intnt = self.__parse_intent(f"lvt => {key}[{i}]", cfg[i])
+                        if intnt is None:
+                            errors += 1
+                            continue
+                        ikey = intent_key(intnt)
+                        if ikey in intents:
+                            # Same intent for the same speakers: merge utterances
+                            utterance = intents[ikey]["Utterance"]
+                            intnt["Utterance"] = utterance + [
+                                u for u in intnt["Utterance"] if u not in utterance
+                            ]
+                        intents[ikey] = intnt
+                else:
+                    errors += 1
+                    _LOGGER.error(
+                        'LVT Config parser: Section "%s" should have list of intents',
+                        key,
+                    )
+
+        if errors > 0:
+            _LOGGER.error(
+                "LVT config: %s invalid intent(s), intents configuration not changed",
+                errors,
+            )
+            return False
+
+        version = intents_version(intents)
+        if version != self.__intents_version:
+            self.__intents = intents
+            self.__intents_version = version
+            self.__matcher = None
+            _LOGGER.debug("Intents vocabulary size: %s", self.intents_vocabulary)
+            for api in self.__apis.values():
+                api.sync_intents()
+        return True
+
+    # endregion
+
+    # region service handlers ###################################################
+    async def __async_dispatch(self, handler: str, call):
+        """Pass service call to every LVT server owning requested speakers.
+        Servers are called concurrently, each one sends a single message.
+        Blocking calls ("blocking: true") wait for all servers to reply"""
+        speakers = call.data.get("speaker", None)
+        apis = [
+            api
+            for api in self.__apis.values()
+            if not bool(speakers) or api.parse_speakers(speakers, active_only=False)
+        ]
+        if not apis:
+            _LOGGER.info("%s: no sutable speakers found", call.service)
+            return None
+        results = await asyncio.gather(
+            *(getattr(api, handler)(call) for api in apis), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        if getattr(call, "return_response", False):
+            return {"results": [result for result in results if result is not None]}
+        return None
+
+    async def handle_play(self, call):
+        """Handle "play" service call"""
+        return await self.__async_dispatch("handle_play", call)
+
+    async def handle_say(self, call):
+        """Handle "say" service call"""
+        return await self.__async_dispatch("handle_say", call)
+
+    async def handle_confirm(self, call):
+        """Handle "confirm" service call"""
+        return await self.__async_dispatch("handle_confirm", call)
+
+    async def handle_negotiate(self, call):
+        """Handle "negotiate" service call"""
+        return await self.__async_dispatch("handle_negotiate", call)
+
+    async def handle_listening_start(self, call):
+        """Handle "listening_start" service call"""
+        return await self.__async_dispatch("handle_listening_start", call)
+
+    async def handle_listening_stop(self, call):
+        """Handle "listening_stop" service call"""
+        return await self.__async_dispatch("handle_listening_stop", call)
+
+    async def handle_restart(self, call):
+        """Handle "restart_speaker" service call"""
+        return await self.__async_dispatch("handle_restart", call)
+
+    # endregion
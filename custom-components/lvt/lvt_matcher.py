@@ -0,0 +1,181 @@
+"""Lite Voice Terminal - local intent matcher.
+
+Utterance templates of all intents are compiled into single word trie.
+Phrase is matched by walking the trie word by word keeping set of active
+states, so matching time depends on phrase length and templates sharing
+its prefixes rather than on total number of templates.
+
+Dictionaries ("<name>") are defined on LVT server side and can not be
+resolved locally: any non-empty sequence of words matches dictionary and
+is returned as slot value.
+"""
+
+import re
+
+from .lvt_utterance import (
+    UtteranceList,
+    UtteranceWildcard,
+    UtteranceWord,
+    compile_utterance,
+)
+
+_WORDS = re.compile(r"\w+")
+
+
+class _Node:
+    """Trie node"""
+
+    __slots__ = ("words", "wildcards", "captures", "accepts")
+
+    def __init__(self) -> None:
+        # word => {slot assignment or None => next node}
+        self.words = {}
+        # variable => next node, matches single word ("?")
+        self.wildcards = {}
+        # (variable, minimal number of words) => next node ("*" and dictionaries)
+        self.captures = {}
+        # intent types accepted at this node
+        self.accepts = []
+
+    def word(self, word: str, assignment=None) -> "_Node":
+        return self.words.setdefault(word, {}).setdefault(assignment, _Node())
+
+
+def split_words(text: str) -> list:
+    """Normalized words of the phrase"""
+    return _WORDS.findall(str(text).lower())
+
+
+def template_words(words) -> list:
+    """Template words tokenized the same way the phrase is ("what's" matches
+    "what" "s"). Stress marks ("з+амок") are ignored"""
+    return [word for text in words for word in split_words(text.replace("+", ""))]
+
+
+class LvtIntentMatcher:
+    """Matches phrases against utterance templates of intents"""
+
+    def __init__(self, intents) -> None:
+        """intents: iterable of intents as sent to LVT server"""
+        self.__root = _Node()
+        self.__templates = 0
+        for intnt in intents:
+            for utterance in intnt["Utterance"]:
+                self.__add(intnt["Intent"], compile_utterance(utterance).nodes)
+                self.__templates += 1
+
+    def __len__(self) -> int:
+        return self.__templates
+
+    def __add(self, intent_type: str, nodes: tuple) -> None:
+        heads = [self.__root]
+        for node in nodes:
+            if isinstance(node, UtteranceWord):
+                for word in template_words((node.word,)):
+                    heads = [head.word(word) for head in heads]
+            elif isinstance(node, UtteranceList):
+                tails = []
+                for head in heads:
+                    for value, option in node.options:
+                        words = template_words(option)
+                        if not words:
+                            # Punctuation only option matches nothing
+                            continue
+                        assignment = None
+                        if node.variable is not None:
+                            slot = value if value is not None else " ".join(option)
+                            assignment = (node.variable, slot)
+                        tail = head.word(words[0], assignment)
+                        for word in words[1:]:
+                            tail = tail.word(word)
+                        tails.append(tail)
+                heads = tails
+            elif isinstance(node, UtteranceWildcard) and node.symbol == "?":
+                heads = [
+                    head.wildcards.setdefault(node.variable, _Node()) for head in heads
+                ]
+            else:
+                minimal = 0 if isinstance(node, UtteranceWildcard) else 1
+                heads = [
+                    head.captures.setdefault((node.variable, minimal), _Node())
+                    for head in heads
+                ]
+            # Identical list options lead to the same node
+            heads = list({id(head): head for head in heads}.values())
+        for head in heads:
+            if intent_type not in head.accepts:
+                head.accepts.append(intent_type)
+
+    def match(self, text: str):
+        """Find intent matching the phrase.
+        Returns (intent type, slots) or None if phrase does not match any template.
+        Template matching most words literally wins"""
+        # State: (node, slots, capture) => number of words matched literally.
+        # capture is (variable, captured words, minimal number of words)
+        # while words are captured by "*" or dictionary leading to node
+        states = self.__closure({(self.__root, (), None): 0})
+        for word in split_words(text):
+            next_states = {}
+            for (node, slots, capture), score in states.items():
+                if capture is not None:
+                    variable, words, minimal = capture
+                    _add_state(
+                        next_states,
+                        (node, slots, (variable, words + (word,), minimal)),
+                        score,
+                    )
+                    continue
+                for assignment, nxt in node.words.get(word, {}).items():
+                    _add_state(
+                        next_states,
+                        (nxt, slots + (assignment,) if assignment else slots, None),
+                        score + 1,
+                    )
+                for variable, nxt in node.wildcards.items():
+                    _add_state(
+                        next_states,
+                        (nxt, slots + ((variable, word),) if variable else slots, None),
+                        score,
+                    )
+            states = self.__closure(next_states)
+            if not states:
+                return None
+
+        best = None
+        for (node, slots, capture), score in states.items():
+            if capture is None and node.accepts:
+                if best is None or score > best[0]:
+                    best = (score, node.accepts[0], slots)
+        if best is None:
+            return None
+        return best[1], dict(best[2])
+
+    @staticmethod
+    def __closure(states: dict) -> dict:
+        """Add states reachable without consuming words"""
+        pending = list(states.items())
+        while pending:
+            (node, slots, capture), score = pending.pop()
+            if capture is not None:
+                variable, words, minimal = capture
+                if len(words) < minimal:
+                    continue
+                if variable is not None:
+                    slots = slots + ((variable, " ".join(words)),)
+                state = (node, slots, None)
+                if _add_state(states, state, score):
+                    pending.append((state, score))
+                continue
+            for (variable, minimal), nxt in node.captures.items():
+                state = (nxt, slots, (variable, (), minimal))
+                if _add_state(states, state, score):
+                    pending.append((state, score))
+        return states
+
+
+def _add_state(states: dict, state: tuple, score: int) -> bool:
+    """Add state keeping the best score. Returns True if state was added or improved"""
+    if states.get(state, -1) >= score:
+        return False
+    states[state] = score
+    return True
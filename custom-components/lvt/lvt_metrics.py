@@ -0,0 +1,92 @@
+"""Lite Voice Terminal - LVT server connection performance counters"""
+
+import bisect
+from collections import Counter
+
+# Histogram bucket upper bounds, milliseconds
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class LvtHistogram:
+    """Fixed buckets latency histogram"""
+
+    __slots__ = ("counts", "count", "total", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add observed duration"""
+        value = seconds * 1000
+        self.counts[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound (ms) of the bucket containing given percentile"""
+        if self.count == 0:
+            return None
+        rank = self.count * pct / 100
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count > 0:
+                if i < len(HISTOGRAM_BUCKETS):
+                    return min(HISTOGRAM_BUCKETS[i], round(self.maximum, 2))
+                break
+        return round(self.maximum, 2)
+
+    def as_dict(self) -> dict:
+        """Summary to be shown as entity attributes"""
+        buckets = {
+            f"le_{bound}ms": count
+            for bound, count in zip(HISTOGRAM_BUCKETS, self.counts)
+            if count
+        }
+        if self.counts[-1]:
+            buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.maximum, 2),
+            "buckets": buckets,
+        }
+
+
+class LvtMetrics:
+    """LVT server connection counters.
+    Per-message counters are collected only while `enabled` (some metrics
+    entity is enabled): callers check `enabled` before recording"""
+
+    def __init__(self) -> None:
+        self.__subscribers = 0
+        self.enabled = False
+        self.sent = Counter()
+        self.received = Counter()
+        self.send_latency = LvtHistogram()
+        self.intent_reply_latency = LvtHistogram()
+        self.intent_handler_duration = LvtHistogram()
+        self.connects = 0
+        self.auth_time = None
+
+    @property
+    def reconnects(self) -> int:
+        """Connections made after the first one"""
+        return max(0, self.connects - 1)
+
+    def subscribe(self) -> None:
+        """Metrics entity enabled: start collecting per-message counters"""
+        self.__subscribers += 1
+        self.enabled = True
+
+    def unsubscribe(self) -> None:
+        """Metrics entity removed: stop collecting if nobody is interested"""
+        self.__subscribers = max(0, self.__subscribers - 1)
+        self.enabled = self.__subscribers > 0
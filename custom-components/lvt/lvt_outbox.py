@@ -0,0 +1,294 @@
+"""Lite Voice Terminal - outbound message queue"""
+
+import asyncio
+import time
+from collections import deque
+
+from .const import (
+    MSG_API_AUTHORIZE,
+    MSG_API_PLAY,
+    MSG_API_SAY,
+    MSG_API_SET_INTENTS,
+    MSG_API_SPEAKER_STATUS,
+    MSG_API_UPDATE_INTENTS,
+)
+
+# Priority levels 0..3 are message importance levels used by LVT services.
+# Connection control messages are sent before any importance level.
+PRIORITY_DEFAULT = 1
+PRIORITY_CONTROL = 4
+PRIORITY_AUTHORIZE = 5
+PRIORITY_LEVELS = PRIORITY_AUTHORIZE + 1
+
+OUTBOX_SIZE = 256
+
+# Time (seconds) message is kept in queue waiting for LVT server connection.
+# Importance-dependent TTL applies to messages of RETAINED_MESSAGES types only
+OUTBOX_TTL = {
+    0: 60,
+    1: 5 * 60,
+    2: 60 * 60,
+    3: 24 * 60 * 60,
+    PRIORITY_CONTROL: 5 * 60,
+    PRIORITY_AUTHORIZE: 5 * 60,
+}
+
+# Messages kept for OUTBOX_TTL and saved to survive HA restart. Dialogs
+# (Negotiate, ListeningStart/Stop) and terminal control (Restart) make no
+# sense once late: they expire after OUTBOX_TRANSIENT_TTL and are not saved
+RETAINED_MESSAGES = frozenset({MSG_API_SAY, MSG_API_PLAY})
+OUTBOX_TRANSIENT_TTL = 30
+
+
+class LvtOutboxEntry:
+    """Message queued to LVT server"""
+
+    __slots__ = (
+        "message",
+        "priority",
+        "key",
+        "expires",
+        "alive",
+        "queued",
+        "persistent",
+    )
+
+    def __init__(self, message: dict, priority: int, key, expires: float) -> None:
+        self.message = message
+        self.priority = priority
+        self.key = key
+        self.expires = expires
+        self.alive = True
+        # Message should survive HA restart
+        self.persistent = (
+            priority < PRIORITY_CONTROL and message["Message"] in RETAINED_MESSAGES
+        )
+        # Monotonic time the message was queued (send latency metrics)
+        self.queued = time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        """Message is too old to be sent"""
+        return time.time() > self.expires
+
+
+def message_priority(message: dict) -> int:
+    """Get queue priority of the message"""
+    msg = message["Message"]
+    if msg == MSG_API_AUTHORIZE:
+        return PRIORITY_AUTHORIZE
+    if msg in (MSG_API_SET_INTENTS, MSG_API_UPDATE_INTENTS, MSG_API_SPEAKER_STATUS):
+        return PRIORITY_CONTROL
+    data = message.get("Data")
+    try:
+        importance = int(data["Importance"])
+    except (KeyError, TypeError, ValueError):
+        return PRIORITY_DEFAULT
+    return 0 if importance < 0 else 3 if importance > 3 else importance
+
+
+def message_ttl(message: dict, priority: int) -> float:
+    """Time (seconds) message waits for LVT server connection"""
+    if priority < PRIORITY_CONTROL and message["Message"] not in RETAINED_MESSAGES:
+        return OUTBOX_TRANSIENT_TTL
+    return OUTBOX_TTL[priority]
+
+
+def message_key(message: dict):
+    """Key identifying messages superseded by newer ones (None if message is unique)"""
+    msg = message["Message"]
+    if msg in (MSG_API_AUTHORIZE, MSG_API_SET_INTENTS, MSG_API_SPEAKER_STATUS):
+        return msg
+    if msg == MSG_API_UPDATE_INTENTS:
+        # Newer intents configuration supersedes any pending one
+        return MSG_API_SET_INTENTS
+    if "RequestId" in message:
+        # Someone is awaiting reply to this message
+        return None
+    if msg in (MSG_API_SAY, MSG_API_PLAY):
+        data = message.get("Data")
+        # Only common chattering is superseded by newer message to the same terminals
+        if isinstance(data, dict) and message_priority(message) == 0:
+            terminals = data.get("Terminals") or []
+            return (msg, tuple(sorted(str(t) for t in terminals)))
+    return None
+
+
+class LvtOutbox:
+    """Bounded priority queue of messages to be sent to LVT server:
+    * Messages are sent in order of priority, FIFO within the same priority
+    * Message superseded by a newer one is replaced in place
+    * Lowest priority messages are dropped if queue overflows
+    * Say / Play expire after importance-dependent OUTBOX_TTL, dialogs sooner
+    * Messages below `min_priority` are held in the queue
+    """
+
+    def __init__(self, maxsize: int = OUTBOX_SIZE) -> None:
+        self.__maxsize = maxsize
+        self.__levels = [deque() for _ in range(PRIORITY_LEVELS)]
+        self.__counts = [0] * PRIORITY_LEVELS
+        self.__keys = {}
+        self.__count = 0
+        self.__persistent = 0
+        self.__min_priority = 0
+        self.__event = asyncio.Event()
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @property
+    def min_priority(self) -> int:
+        """Lowest priority of messages get_nowait() / async_get() return"""
+        return self.__min_priority
+
+    @min_priority.setter
+    def min_priority(self, priority: int) -> None:
+        self.__min_priority = priority
+        # Wake up async_get() to check messages released
+        self.__event.set()
+
+    @property
+    def persistent(self) -> bool:
+        """Some message waiting to be sent should survive HA restart"""
+        return self.__persistent > 0
+
+    def __contains__(self, key) -> bool:
+        """Message with given key is waiting to be sent"""
+        return key in self.__keys
+
+    def put(self, message: dict) -> bool:
+        """Queue message. Returns False if message was dropped"""
+        priority = message_priority(message)
+        key = message_key(message)
+
+        if key is not None and key in self.__keys:
+            entry = self.__keys[key]
+            if key == MSG_API_SPEAKER_STATUS:
+                entry.message["Data"] = {**entry.message["Data"], **message["Data"]}
+            else:
+                entry.message = message
+            entry.expires = time.time() + message_ttl(message, priority)
+            return True
+
+        return self.__put(
+            LvtOutboxEntry(
+                message, priority, key, time.time() + message_ttl(message, priority)
+            )
+        )
+
+    def __put(self, entry: LvtOutboxEntry) -> bool:
+        if self.__count >= self.__maxsize and not self.__shed(entry.priority):
+            return False
+        self.__levels[entry.priority].append(entry)
+        self.__add(entry)
+        return True
+
+    def requeue(self, entry: LvtOutboxEntry) -> None:
+        """Return entry taken from the queue back to its head"""
+        if entry.key is not None and entry.key in self.__keys:
+            # Newer message with the same key is already queued
+            if entry.key == MSG_API_SPEAKER_STATUS:
+                # Status changes of both messages are to be sent, newer win
+                newer = self.__keys[entry.key]
+                newer.message["Data"] = {
+                    **entry.message["Data"],
+                    **newer.message["Data"],
+                }
+            return
+        entry.alive = True
+        self.__levels[entry.priority].appendleft(entry)
+        self.__add(entry)
+
+    def get_nowait(self) -> LvtOutboxEntry:
+        """Take most important entry from the queue (None if empty)"""
+        for level in reversed(self.__levels[self.__min_priority :]):
+            while level:
+                entry = level.popleft()
+                if entry.alive:
+                    self.__remove(entry)
+                    if not entry.expired:
+                        return entry
+        return None
+
+    async def async_get(self) -> LvtOutboxEntry:
+        """Wait for and take most important entry from the queue"""
+        while True:
+            while not any(self.__counts[self.__min_priority :]):
+                self.__event.clear()
+                await self.__event.wait()
+            entry = self.get_nowait()
+            if entry is not None:
+                return entry
+
+    def remove_request(self, request_id: str) -> bool:
+        """Drop queued request nobody awaits reply to any more.
+        Returns False if request was already taken from the queue"""
+        for level in self.__levels:
+            for entry in level:
+                if entry.alive and entry.message.get("RequestId") == request_id:
+                    self.__remove(entry)
+                    return True
+        return False
+
+    def dump(self) -> list:
+        """Persistent messages in the order they will be sent"""
+        return [
+            {"Message": entry.message, "Expires": entry.expires}
+            for level in reversed(self.__levels)
+            for entry in level
+            if entry.alive and entry.persistent and not entry.expired
+        ]
+
+    def restore(self, messages: list) -> None:
+        """Queue messages saved with dump(). Expired messages are dropped"""
+        for item in messages:
+            try:
+                message = item["Message"]
+                entry = LvtOutboxEntry(
+                    message,
+                    message_priority(message),
+                    message_key(message),
+                    float(item["Expires"]),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            if entry.expired or not entry.persistent:
+                continue
+            if entry.key is not None and entry.key in self.__keys:
+                continue
+            self.__put(entry)
+
+    def clear(self) -> None:
+        """Drop all queued messages"""
+        for level in self.__levels:
+            level.clear()
+        self.__keys.clear()
+        self.__counts = [0] * PRIORITY_LEVELS
+        self.__count = 0
+        self.__persistent = 0
+
+    def __add(self, entry: LvtOutboxEntry) -> None:
+        if entry.key is not None:
+            self.__keys[entry.key] = entry
+        self.__counts[entry.priority] += 1
+        self.__count += 1
+        self.__persistent += entry.persistent
+        self.__event.set()
+
+    def __remove(self, entry: LvtOutboxEntry) -> None:
+        entry.alive = False
+        if entry.key is not None and self.__keys.get(entry.key) is entry:
+            del self.__keys[entry.key]
+        self.__counts[entry.priority] -= 1
+        self.__count -= 1
+        self.__persistent -= entry.persistent
+
+    def __shed(self, priority: int) -> bool:
+        """Drop the oldest message of the lowest priority not above given one"""
+        for level in self.__levels[: priority + 1]:
+            while level:
+                entry = level.popleft()
+                if entry.alive:
+                    self.__remove(entry)
+                    return True
+        return False
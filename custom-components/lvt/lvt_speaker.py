@@ -5,8 +5,7 @@ import logging
 from homeassistant.helpers.device_registry import DeviceEntry, DeviceRegistry
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_registry import EntityRegistry, RegistryEntry
-from homeassistant.util import slugify
-from .const import DOMAIN, lvt_unique_id
+from .const import DOMAIN, lvt_speaker_device_id, lvt_unique_id
 from .binary_sensor import LvtOnlineEntity
 from .select import LvtFilterEntity
 from .number import LvtVolumeEntity
@@ -14,43 +13,69 @@ from .number import LvtVolumeEntity
 
 _LOGGER = logging.getLogger(__name__)
 
+# LVT speaker info fields used in device_info
+DEVICE_INFO_FIELDS = {"Name", "Location", "Version", "Address"}
+
+# Speaker entity id => entity platform
+SPEAKER_ENTITY_PLATFORMS = {
+    "online": "binary_sensor",
+    "volume": "number",
+    "filter": "select",
+}
+
 
 class LvtSpeaker:
     """LVT Speaker class."""
 
-    def __init__(self, hass, speaker_id, server_online: bool) -> None:
+    def __init__(self, hass, lvt_api, speaker_id, server_online: bool) -> None:
         self.hass = hass
+        self.__api = lvt_api
         self.__id = speaker_id
+        self.__identifier = lvt_speaker_device_id(lvt_api.server_id, speaker_id)
         self.__info = {}
         self.__entities = {}
         self.__server_online = server_online
+        self.__device_info = None
+        self.__device = None
+        self.__device_cached = False
+        self.__entity_ids = {}
         # _LOGGER.info("LVT Speaker %s (%s) created", self._name, self._id)
 
     async def async_update(self, info: dict[str, any]):
-        """ "Update LvtSpeaker state with dictionary sent by server"""
-        _name = self.device_info["name"]
-        _model = self.device_info["model"]
-        _sw_version = self.device_info["sw_version"]
+        """ "Update LvtSpeaker state with dictionary sent by server.
+        Only device and entities affected by changed fields are updated"""
+        changed = {
+            key
+            for key in info.keys() | self.__info.keys()
+            if info.get(key) != self.__info.get(key)
+        }
+        if not changed:
+            return
+
+        old_info = self.device_info
         self.__info = info
+        if not changed.isdisjoint(DEVICE_INFO_FIELDS):
+            self.__device_info = None
+        new_info = self.device_info
 
         device = self.device
         if device is not None:
             if not device.disabled:
-                if (
-                    _name != self.device_info["name"]
-                    or _model != self.device_info["model"]
-                    or _sw_version != self.device_info["sw_version"]
+                if old_info is not new_info and (
+                    old_info["name"] != new_info["name"]
+                    or old_info["model"] != new_info["model"]
+                    or old_info["sw_version"] != new_info["sw_version"]
                 ):
                     registry: DeviceRegistry = self.hass.data["device_registry"]
                     if registry is not None:
                         registry.async_update_device(
-                            self.device.id,
-                            name=self.device_info["name"],
-                            model=self.device_info["model"],
-                            sw_version=self.device_info["sw_version"],
+                            device.id,
+                            name=new_info["name"],
+                            model=new_info["model"],
+                            sw_version=new_info["sw_version"],
                         )
 
-                self.update_entities()
+                self.update_entities(changed)
         elif self.online:
             self.create_entities()
             self.update_entities()
@@ -58,7 +83,29 @@ class LvtSpeaker:
     def set_server_online(self, is_online: bool):
         """ "Update speaker' HA entities reflecting LVT API connection status"""
         self.__server_online = is_online
-        self.update_entities()
+        self.update_entities({"Connected"})
+
+    def invalidate_registry_cache(self):
+        """HA registries updated: drop cached device and entity registry entries"""
+        self.__device = None
+        self.__device_cached = False
+        self.__entity_ids = {}
+
+    def caches_registry_entry(
+        self, device_id: str = None, entity_id: str = None, area_id: str = None
+    ) -> bool:
+        """Device (or its area) or entity registry entry is cached by the speaker"""
+        device = self.__device
+        if device is not None:
+            if device_id is not None and device.id == device_id:
+                return True
+            if area_id is not None and device.area_id == area_id:
+                return True
+        return entity_id is not None and entity_id in self.__entity_ids.values()
+
+    def async_mark_dirty(self):
+        """Volume or filter changed in HA: schedule update to LVT server"""
+        self.__api.async_speaker_changed(self)
 
     @property
     def name(self) -> str:
@@ -69,11 +116,32 @@ class LvtSpeaker:
             else f"LVT Speaker [{self.id}]"
         )
 
+    @property
+    def api(self):
+        """LVT API client (server connection) owning the speaker"""
+        return self.__api
+
     @property
     def id(self) -> str:
         """Get the LVT Speaker Id"""
         return self.__id
 
+    @property
+    def identifier(self) -> str:
+        """Device registry identifier (namespaced with LVT server id)"""
+        return self.__identifier
+
+    @property
+    def aliases(self) -> set:
+        """Ids speaker can be referred by: speaker id, device id and area id"""
+        aliases = {str(self.id).lower()}
+        device = self.device
+        if device is not None:
+            aliases.add(device.id)
+            if device.area_id:
+                aliases.add(device.area_id)
+        return aliases
+
     @property
     def entities(self) -> dict[str, any]:
         """Get the LVT Speaker Id"""
@@ -82,7 +150,12 @@ class LvtSpeaker:
     @property
     def online(self) -> bool:
         """Is speaker online now?"""
-        if not self.__server_online or "Connected" not in self.__info:
+        return self.__server_online and self.connected
+
+    @property
+    def connected(self) -> bool:
+        """Was speaker connected to LVT server last time server reported it"""
+        if "Connected" not in self.__info:
             return False
         return bool(self.__info["Connected"])
 
@@ -133,58 +206,77 @@ class LvtSpeaker:
     @property
     def device_info(self) -> DeviceInfo:
         """Unified device info dictionary for LvtSpeaker."""
-        return {
-            "identifiers": {(DOMAIN, slugify(self.id))},
-            "name": self.name,
-            "manufacturer": "Lite Voice Terminal",
-            "model": "Speaker at {}".format(self.address),
-            "suggested_area": self.suggested_area,
-            "sw_version": self.version,
-        }
+        if self.__device_info is None:
+            self.__device_info = {
+                "identifiers": {(DOMAIN, self.identifier)},
+                "name": self.name,
+                "manufacturer": "Lite Voice Terminal",
+                "model": "Speaker at {}".format(self.address),
+                "suggested_area": self.suggested_area,
+                "sw_version": self.version,
+            }
+        return self.__device_info
 
     @property
     def device(self) -> DeviceEntry:
         """ "Retrieve Speaker device from device registry"""
-        registry: DeviceRegistry = self.hass.data["device_registry"]
-        if registry is not None:
-            return registry.async_get_device({(DOMAIN, slugify(self.id))})
-        else:
-            return None
+        if not self.__device_cached:
+            registry: DeviceRegistry = self.hass.data["device_registry"]
+            if registry is None:
+                return None
+            device = registry.async_get_device(self.device_info["identifiers"])
+            if device is not None and not self.__api.owns_device(device):
+                # Device of the same speaker id registered by another LVT server
+                device = None
+            self.__device = device
+            self.__device_cached = True
+        return self.__device
 
     def get_entity_entry(self, eid: str) -> RegistryEntry:
         """Get entity description from registry"""
         registry: EntityRegistry = self.hass.data["entity_registry"]
-        if registry is not None:
-            uid = lvt_unique_id(self.id, eid)
-            for _, entry in registry.entities.items():
-                if entry.platform == DOMAIN and entry.unique_id == uid:
-                    return entry
-        return None
+        if registry is None:
+            return None
+        if eid not in self.__entity_ids:
+            self.__entity_ids[eid] = registry.async_get_entity_id(
+                SPEAKER_ENTITY_PLATFORMS[eid],
+                DOMAIN,
+                lvt_unique_id(self.id, eid, self.__api.server_id),
+            )
+        entity_id = self.__entity_ids[eid]
+        return registry.async_get(entity_id) if entity_id is not None else None
 
     def create_entities(self):
-        """Create LvtSpeaker HA entities"""
-        if self.get_entity_entry("online") is None:
-            self.entities["online"] = LvtOnlineEntity(self.hass, self)
+        """Create LvtSpeaker HA entities not created or registered yet"""
+        if "online" not in self.entities and self.get_entity_entry("online") is None:
+            self.entities["online"] = LvtOnlineEntity(self.hass, self.__api, self)
+            self.__api.add_entities("binary_sensor", [self.entities["online"]])
 
-        if self.get_entity_entry("filter") is None:
-            self.entities["filter"] = LvtFilterEntity(self.hass, self)
+        if "filter" not in self.entities and self.get_entity_entry("filter") is None:
+            self.entities["filter"] = LvtFilterEntity(self.hass, self.__api, self)
+            self.__api.add_entities("select", [self.entities["filter"]])
 
-        if self.get_entity_entry("volume") is None:
-            self.entities["volume"] = LvtVolumeEntity(self.hass, self)
+        if "volume" not in self.entities and self.get_entity_entry("volume") is None:
+            self.entities["volume"] = LvtVolumeEntity(self.hass, self.__api, self)
+            self.__api.add_entities("number", [self.entities["volume"]])
 
-    def update_entities(self):
-        """Synchronize HA entities state with LvtSpeaker state"""
-        if "online" in self.entities:
+    def update_entities(self, changed: set = None):
+        """Synchronize HA entities state with LvtSpeaker state.
+        changed: set of LVT speaker info fields changed (None to update all)"""
+        online_changed = changed is None or "Connected" in changed
+        if "online" in self.entities and online_changed:
             self.entities["online"].set_online(self.online)
 
         if "volume" in self.entities:
-            self.entities["volume"].set_online(self.online)
-            if "Volume" in self.__info:
+            if online_changed:
+                self.entities["volume"].set_online(self.online)
+            if "Volume" in self.__info and (changed is None or "Volume" in changed):
                 self.entities["volume"].set_native_value(int(self.__info["Volume"]))
 
         if "filter" in self.entities:
-            self.entities["filter"].set_online(self.online)
-            if "Filter" in self.__info:
+            if online_changed:
+                self.entities["filter"].set_online(self.online)
+            if "Filter" in self.__info and (changed is None or "Filter" in changed):
                 self.entities["filter"].select_option(int(self.__info["Filter"]))
 
         return
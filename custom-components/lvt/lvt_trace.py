@@ -0,0 +1,70 @@
+"""Lite Voice Terminal - tracing of intents fired by LVT server"""
+
+import contextvars
+import secrets
+import time
+from collections import deque
+
+# Number of spans kept in memory
+TRACE_BUFFER_SIZE = 1000
+
+# Trace id of the intent being handled. Set while intent handler and triggered
+# automations run, so messages they send to LVT server are tagged with trace id
+current_trace_id: contextvars.ContextVar = contextvars.ContextVar(
+    "lvt_trace_id", default=None
+)
+
+
+def new_trace_id() -> str:
+    """Generate random trace id"""
+    return secrets.token_hex(8)
+
+
+class LvtTracer:
+    """Bounded ring of timestamped spans. Span timing uses time.monotonic(),
+    spans are exported with wall clock start time"""
+
+    def __init__(self, maxlen: int = TRACE_BUFFER_SIZE) -> None:
+        self.__spans = deque(maxlen=maxlen)
+
+    def __len__(self) -> int:
+        return len(self.__spans)
+
+    def record(
+        self, trace_id: str, name: str, started: float, finished: float = None, **attrs
+    ) -> None:
+        """Add span of trace started (and finished) at given monotonic time"""
+        if trace_id is None:
+            return
+        if finished is None:
+            finished = time.monotonic()
+        self.__spans.append((trace_id, name, started, finished, attrs))
+
+    def clear(self) -> None:
+        """Drop recorded spans"""
+        self.__spans.clear()
+
+    def export(self) -> dict:
+        """Spans grouped by trace id, ordered by start time"""
+        offset = time.time() - time.monotonic()
+        traces = {}
+        for trace_id, name, started, finished, attrs in self.__spans:
+            traces.setdefault(trace_id, []).append(
+                {
+                    "name": name,
+                    "start": round(started + offset, 6),
+                    "duration_ms": round((finished - started) * 1000, 3),
+                    **attrs,
+                }
+            )
+        result = {}
+        for trace_id, spans in traces.items():
+            spans.sort(key=lambda span: span["start"])
+            begin = spans[0]["start"]
+            end = max(span["start"] + span["duration_ms"] / 1000 for span in spans)
+            result[trace_id] = {
+                "start": begin,
+                "duration_ms": round((end - begin) * 1000, 3),
+                "spans": spans,
+            }
+        return result
@@ -0,0 +1,241 @@
+"""Lite Voice Terminal - utterance template compiler.
+
+Parses utterance templates (see "Язык описания ключевых фраз" in README):
+
+    <utterance> ::=  UTTERANCE {UTTERANCE}
+    UTTERANCE ::= WORD | [VARIABLE=]"?" | [VARIABLE=]"*" | [VARIABLE=]"["LIST"]" | [VARIABLE=]"<"DICTIONARY">"
+    LIST ::= [VALUE=]WORD {WORD} { "," [VALUE=] WORD {WORD} }
+"""
+
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+# Number of compiled utterances kept in cache
+UTTERANCE_CACHE_SIZE = 1024
+
+_NAME = re.compile(r"\w+")
+_SPACES = re.compile(r"\s+")
+_SPECIAL = "=[]<>,?*"
+
+
+class UtteranceError(ValueError):
+    """Invalid utterance template"""
+
+    def __init__(self, message: str, utterance: str, pos: int = None) -> None:
+        if pos is not None:
+            message = f"{message} at position {pos + 1}"
+        super().__init__(f'{message}: "{utterance}"')
+        self.pos = pos
+
+
+class UtteranceWord(NamedTuple):
+    """Word to be recognized as is"""
+
+    word: str
+
+    def __str__(self) -> str:
+        return self.word
+
+
+class UtteranceWildcard(NamedTuple):
+    """Any single word ("?") or any number of words ("*")"""
+
+    variable: Optional[str]
+    symbol: str
+
+    def __str__(self) -> str:
+        return _with_variable(self.variable, self.symbol)
+
+
+class UtteranceList(NamedTuple):
+    """One of the phrases listed, options are (value, words) pairs"""
+
+    variable: Optional[str]
+    options: tuple
+
+    def __str__(self) -> str:
+        options = ",".join(
+            " ".join(words) if value is None else f"{value}={' '.join(words)}"
+            for value, words in self.options
+        )
+        return _with_variable(self.variable, f"[{options}]")
+
+
+class UtteranceDictionary(NamedTuple):
+    """One of the definitions of LVT server dictionary"""
+
+    variable: Optional[str]
+    name: str
+
+    def __str__(self) -> str:
+        return _with_variable(self.variable, f"<{self.name}>")
+
+
+class CompiledUtterance(NamedTuple):
+    """Parsed and validated utterance template"""
+
+    text: str
+    nodes: tuple
+    slots: frozenset
+    vocabulary: frozenset
+    dictionaries: frozenset
+
+
+def _with_variable(variable: Optional[str], text: str) -> str:
+    return text if variable is None else f"{variable}={text}"
+
+
+class _Parser:
+    """Recursive descent parser of a single utterance template"""
+
+    def __init__(self, utterance: str) -> None:
+        self.utterance = utterance
+        self.pos = 0
+
+    def error(self, message: str, pos: int = None):
+        raise UtteranceError(message, self.utterance, self.pos if pos is None else pos)
+
+    def skip_spaces(self):
+        while self.pos < len(self.utterance) and self.utterance[self.pos].isspace():
+            self.pos += 1
+
+    def peek(self) -> str:
+        return self.utterance[self.pos] if self.pos < len(self.utterance) else ""
+
+    def expect(self, char: str):
+        self.skip_spaces()
+        if self.peek() != char:
+            self.error(f'"{char}" expected')
+        self.pos += 1
+
+    def token(self) -> str:
+        """Word, variable, value or dictionary name"""
+        start = self.pos
+        while self.pos < len(self.utterance):
+            char = self.utterance[self.pos]
+            if char.isspace() or char in _SPECIAL:
+                break
+            self.pos += 1
+        return self.utterance[start : self.pos]
+
+    def name(self, what: str) -> str:
+        pos = self.pos
+        name = self.token()
+        if not _NAME.fullmatch(name):
+            self.error(f"Invalid {what} name", pos)
+        return name
+
+    def parse(self) -> tuple:
+        nodes = []
+        while True:
+            self.skip_spaces()
+            if self.pos >= len(self.utterance):
+                break
+            nodes.append(self.parse_node())
+        if not nodes:
+            self.error("Empty utterance")
+        return tuple(nodes)
+
+    def parse_node(self):
+        char = self.peek()
+        if char in "?*[<":
+            return self.parse_value(None)
+        if char in "=]>,":
+            self.error(f'Unexpected "{char}"')
+
+        pos = self.pos
+        word = self.token()
+        if self.peek() != "=":
+            return UtteranceWord(word.lower())
+
+        # VARIABLE=...
+        if not _NAME.fullmatch(word):
+            self.error("Invalid variable name", pos)
+        self.pos += 1
+        if self.peek() not in ("?", "*", "[", "<"):
+            self.error('"?", "*", "[" or "<" expected after variable name')
+        return self.parse_value(word)
+
+    def parse_value(self, variable: Optional[str]):
+        char = self.peek()
+        self.pos += 1
+        if char in "?*":
+            return UtteranceWildcard(variable, char)
+        if char == "<":
+            self.skip_spaces()
+            name = self.name("dictionary")
+            self.expect(">")
+            return UtteranceDictionary(variable, name)
+        return UtteranceList(variable, self.parse_options())
+
+    def parse_options(self) -> tuple:
+        options = []
+        values = set()
+        while True:
+            value, words = self.parse_option()
+            if value is not None:
+                if value in values:
+                    self.error(f'Duplicate value "{value}"')
+                values.add(value)
+            options.append((value, words))
+            self.skip_spaces()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return tuple(options)
+            if char != ",":
+                self.error('"," or "]" expected', self.pos - 1)
+
+    def parse_option(self) -> tuple:
+        value = None
+        words = []
+        while True:
+            self.skip_spaces()
+            pos = self.pos
+            if self.peek() == "" or self.peek() in "[]<>,?*=":
+                break
+            word = self.token()
+            if self.peek() == "=":
+                if value is not None or words:
+                    self.error("Value should precede option words", pos)
+                value = word
+                self.pos += 1
+                continue
+            words.append(word.lower())
+        if not words:
+            self.error("Empty list option")
+        return value, tuple(words)
+
+
+@lru_cache(maxsize=UTTERANCE_CACHE_SIZE)
+def compile_utterance(utterance: str) -> CompiledUtterance:
+    """Parse and validate utterance template. Raises UtteranceError"""
+    nodes = _Parser(_SPACES.sub(" ", str(utterance)).strip()).parse()
+
+    slots = set()
+    vocabulary = set()
+    dictionaries = set()
+    for node in nodes:
+        if isinstance(node, UtteranceWord):
+            vocabulary.add(node.word)
+            continue
+        if node.variable is not None:
+            if node.variable in slots:
+                raise UtteranceError(
+                    f'Duplicate variable "{node.variable}"', utterance
+                )
+            slots.add(node.variable)
+        if isinstance(node, UtteranceList):
+            for _, words in node.options:
+                vocabulary.update(words)
+        elif isinstance(node, UtteranceDictionary):
+            dictionaries.add(node.name)
+
+    return CompiledUtterance(
+        " ".join(str(node) for node in nodes),
+        nodes,
+        frozenset(slots),
+        frozenset(vocabulary),
+        frozenset(dictionaries),
+    )
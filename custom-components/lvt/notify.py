@@ -1,7 +1,7 @@
 """LVT support for notify component."""
 from typing import Any
 import voluptuous as vol
-from .lvt import LvtApi
+from .lvt_hub import LvtHub
 from homeassistant.core import ServiceCall
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import template
@@ -52,7 +52,7 @@ class LVTNotificationService(BaseNotificationService):
 
     async def async_send_message(self, message="", **kwargs):
         """Send a message to LVT."""
-        lvt_api: LvtApi = self.hass.data[DOMAIN]
+        lvt_hub: LvtHub = self.hass.data[DOMAIN]
         data = kwargs.get(ATTR_DATA)
         if data is None:
             data = {}
@@ -64,4 +64,4 @@ class LVTNotificationService(BaseNotificationService):
         data["volume"] = volume if volume is not None else self.volume
         data["say"] = message if bool(message) else "Текст сообщения не задан"
         call = ServiceCall(DOMAIN, "lvt.say", data=data)
-        await lvt_api.handle_say(call)
+        await lvt_hub.handle_say(call)
@@ -5,25 +5,27 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import DOMAIN, VOLUME_TITLE
 from .lvt_entity import LvtEntity
 
-LVT_NUMBER_ADD_ENTITIES: AddEntitiesCallback = None
-
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the LVT Speaker "number" config entry."""
-    await async_setup_platform(hass, config_entry, async_add_entities)
+    await async_setup_platform(
+        hass, config_entry, async_add_entities, {"api": config_entry.entry_id}
+    )
 
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     """Set up the LVT Speaker "number" platform."""
-    global LVT_NUMBER_ADD_ENTITIES
-    LVT_NUMBER_ADD_ENTITIES = async_add_entities
-    lvt_api = hass.data[DOMAIN]
+    if discovery_info is None:
+        return
+    lvt_api = hass.data[DOMAIN].apis[discovery_info["api"]]
+    lvt_api.platform_loaded("number", async_add_entities)
 
+    entities = []
     for _, speaker in lvt_api.speakers.items():
         if "volume" not in speaker.entities:
-            speaker.entities["volume"] = LvtVolumeEntity(hass, speaker)
-
-    lvt_api.platform_loaded("number")
+            speaker.entities["volume"] = LvtVolumeEntity(hass, lvt_api, speaker)
+            entities.append(speaker.entities["volume"])
+    lvt_api.add_entities("number", entities)
 
 
 class LvtVolumeEntity(NumberEntity, LvtEntity):
@@ -31,10 +33,9 @@ class LvtVolumeEntity(NumberEntity, LvtEntity):
 
     async_add_entities: AddEntitiesCallback = None
 
-    def __init__(self, hass, lvt_speaker) -> None:
+    def __init__(self, hass, lvt_api, lvt_speaker) -> None:
         """Initialize the LVT Number entity"""
-        global LVT_NUMBER_ADD_ENTITIES
-        super().__init__(hass, lvt_speaker, "volume")
+        super().__init__(hass, lvt_api, lvt_speaker, "volume")
         self._attr_should_poll: bool = False
         self._att_icon = "mdi:account-voice"
         self._attr_name = VOLUME_TITLE.format(self.speaker_id)
@@ -45,12 +46,16 @@ class LvtVolumeEntity(NumberEntity, LvtEntity):
         self._attr_native_step = 10
         self._attr_native_value = 50
 
-        LVT_NUMBER_ADD_ENTITIES([self])
-
     def set_native_value(self, value: int) -> None:
         """Update the current value."""
         if self.enabled:
             is_updated = int(self._attr_native_value) != int(value)
             self._attr_native_value = value
             if is_updated:
-                self.schedule_update_ha_state()
+                self.schedule_state_write()
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Volume changed by user: update state and LVT server"""
+        self.set_native_value(int(value))
+        if self.speaker is not None:
+            self.speaker.async_mark_dirty()
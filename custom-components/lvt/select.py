@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from homeassistant.components.select import SelectEntity
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import (
     DOMAIN,
@@ -9,25 +8,27 @@ from .const import (
 )
 from .lvt_entity import LvtEntity
 
-LVT_SELECT_ADD_ENTITIES: AddEntitiesCallback = None
-
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     """Set up the LVT Speaker "select" config entry."""
-    await async_setup_platform(hass, config_entry, async_add_entities)
+    await async_setup_platform(
+        hass, config_entry, async_add_entities, {"api": config_entry.entry_id}
+    )
 
 
 async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
     """Set up the LVT Speaker "select" platform."""
-    global LVT_SELECT_ADD_ENTITIES
-    LVT_SELECT_ADD_ENTITIES = async_add_entities
-    lvt_api = hass.data[DOMAIN]
+    if discovery_info is None:
+        return
+    lvt_api = hass.data[DOMAIN].apis[discovery_info["api"]]
+    lvt_api.platform_loaded("select", async_add_entities)
 
+    entities = []
     for _, speaker in lvt_api.speakers.items():
         if "filter" not in speaker.entities:
-            speaker.entities["filter"] = LvtFilterEntity(hass, speaker)
-
-    lvt_api.platform_loaded("select")
+            speaker.entities["filter"] = LvtFilterEntity(hass, lvt_api, speaker)
+            entities.append(speaker.entities["filter"])
+    lvt_api.add_entities("select", entities)
 
 
 class LvtFilterEntity(SelectEntity, LvtEntity):
@@ -35,10 +36,9 @@ class LvtFilterEntity(SelectEntity, LvtEntity):
 
     _attr_device_class = "importance__filter"
 
-    def __init__(self, hass, lvt_speaker) -> None:
+    def __init__(self, hass, lvt_api, lvt_speaker) -> None:
         """Initialize the LVT Speaker Importance Filter entity"""
-        global LVT_SELECT_ADD_ENTITIES
-        super().__init__(hass, lvt_speaker, "filter")
+        super().__init__(hass, lvt_api, lvt_speaker, "filter")
 
         self._attr_icon = "mdi:account-filter"
         self._attr_device_class = "importance__filter"
@@ -52,7 +52,6 @@ class LvtFilterEntity(SelectEntity, LvtEntity):
             "4",
         ]
         self._attr_current_option = self._attr_options[0]
-        LVT_SELECT_ADD_ENTITIES([self])
 
     def select_option(self, option: str) -> None:
         """Update the current selected option."""
@@ -63,4 +62,10 @@ class LvtFilterEntity(SelectEntity, LvtEntity):
             is_updated = self._attr_current_option != flt
             self._attr_current_option = flt
             if is_updated:
-                self.schedule_update_ha_state()
+                self.schedule_state_write()
+
+    async def async_select_option(self, option: str) -> None:
+        """Filter changed by user: update state and LVT server"""
+        self.select_option(option)
+        if self.speaker is not None:
+            self.speaker.async_mark_dirty()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfTime
+
+from .const import DOMAIN, SERVER_METRIC_TITLE
+from .lvt_entity import LvtEntity
+
+# Metric sensors are polled: counters are updated too often to push every change
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# Metric id => (title, unit, state class)
+LVT_METRICS = {
+    "queue_depth": ("outbound queue", "messages", SensorStateClass.MEASUREMENT),
+    "messages_sent": ("messages sent", "messages", SensorStateClass.TOTAL_INCREASING),
+    "messages_received": (
+        "messages received",
+        "messages",
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+    "send_latency": (
+        "send latency",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "intent_reply_latency": (
+        "intent reply latency",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "intent_handler_duration": (
+        "intent handler duration",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "reconnects": ("reconnects", None, SensorStateClass.TOTAL_INCREASING),
+    "auth_time": ("auth time", UnitOfTime.MILLISECONDS, SensorStateClass.MEASUREMENT),
+}
+
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    """Set up the LVT "sensor" config entry."""
+    await async_setup_platform(
+        hass, config_entry, async_add_entities, {"api": config_entry.entry_id}
+    )
+
+
+async def async_setup_platform(hass, config, async_add_entities, discovery_info=None):
+    """Set up the LVT sensor platform (LVT server connection metrics)."""
+    if discovery_info is None:
+        return
+    lvt_api = hass.data[DOMAIN].apis[discovery_info["api"]]
+    lvt_api.platform_loaded("sensor", async_add_entities)
+
+    entities = []
+    for metric in LVT_METRICS:
+        if metric not in lvt_api.entities:
+            lvt_api.entities[metric] = LvtMetricEntity(hass, lvt_api, metric)
+            entities.append(lvt_api.entities[metric])
+    lvt_api.add_entities("sensor", entities)
+
+
+class LvtMetricEntity(SensorEntity, LvtEntity):
+    """LVT server connection metric. Disabled by default: per-message
+    counters are collected only while some metric entity is enabled"""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, hass, lvt_api, metric: str) -> None:
+        """Initialize LVT server metric sensor"""
+        super().__init__(hass, lvt_api, None, metric)
+        title, unit, state_class = LVT_METRICS[metric]
+        self._metric = metric
+        self._attr_should_poll = True
+        self._attr_available = True
+        self._attr_icon = "mdi:chart-line"
+        self._attr_name = SERVER_METRIC_TITLE.format(title)
+        if lvt_api.server_id is not None:
+            self._attr_name += f" [{lvt_api.server_id}]"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_native_value = None
+        self._attr_extra_state_attributes = {}
+
+    async def async_added_to_hass(self) -> None:
+        self.lvt_api.metrics.subscribe()
+        await self.async_update()
+
+    async def async_will_remove_from_hass(self) -> None:
+        self.lvt_api.metrics.unsubscribe()
+        await super().async_will_remove_from_hass()
+
+    async def async_update(self) -> None:
+        """Read metric value"""
+        metrics = self.lvt_api.metrics
+        metric = self._metric
+        attributes = {}
+        if metric == "queue_depth":
+            value = self.lvt_api.queue_depth
+        elif metric in ("messages_sent", "messages_received"):
+            counts = metrics.sent if metric == "messages_sent" else metrics.received
+            value = sum(counts.values())
+            attributes = dict(counts)
+        elif metric == "reconnects":
+            value = metrics.reconnects
+        elif metric == "auth_time":
+            auth_time = metrics.auth_time
+            value = round(auth_time * 1000, 1) if auth_time is not None else None
+        else:
+            attributes = getattr(metrics, metric).as_dict()
+            value = attributes["p50_ms"]
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
@@ -1,5 +1,6 @@
 """LVT automation trigger rules."""
 
+import re
 from typing import Any
 import voluptuous as vol
 from homeassistant.core import CALLBACK_TYPE, callback
@@ -16,16 +17,59 @@ _TRIGGER_SCHEMA = cv.TRIGGER_BASE_SCHEMA.extend(
         #     EVENT_INTENT, EVENT_ONLINE
         # ),
         vol.Required(CONF_INTENT): cv.string,
-        vol.Optional(CONF_SPEAKER): cv.string,
-        vol.Optional(CONF_DATA): object,
+        vol.Optional(CONF_SPEAKER): vol.All(cv.ensure_list_csv, [cv.string]),
+        vol.Optional(CONF_DATA): vol.Schema({cv.string: object}),
     },
     # extra=1,
 )
 
 
+def compile_speaker_filter(config) -> frozenset:
+    """Set of speaker ids, device ids or area ids the trigger is limited to"""
+    if not config.get(CONF_SPEAKER):
+        return None
+    return frozenset(str(speaker).strip().lower() for speaker in config[CONF_SPEAKER])
+
+
+def _compile_value_filter(slot: str, value):
+    """Compile slot value matcher: regex, list of values or single value"""
+    if isinstance(value, dict):
+        if set(value) != {"regex"}:
+            raise vol.Invalid(f'{CONF_DATA}.{slot}: only "regex" matcher is supported')
+        try:
+            pattern = re.compile(str(value["regex"]), re.IGNORECASE)
+        except re.error as ex:
+            raise vol.Invalid(f"{CONF_DATA}.{slot}: invalid regex: {ex}") from ex
+        return lambda v: pattern.fullmatch(str(v)) is not None
+    if isinstance(value, list):
+        values = frozenset(str(v).lower() for v in value)
+        return lambda v: str(v).lower() in values
+    value = str(value).lower()
+    return lambda v: str(v).lower() == value
+
+
+def compile_data_filter(config):
+    """Predicate matching intent data (slot values) against trigger' "data" """
+    if not config.get(CONF_DATA):
+        return None
+    matchers = [
+        (slot, _compile_value_filter(slot, value))
+        for slot, value in config[CONF_DATA].items()
+    ]
+
+    def data_filter(intent_data: dict) -> bool:
+        for slot, matcher in matchers:
+            if slot not in intent_data or not matcher(intent_data[slot]):
+                return False
+        return True
+
+    return data_filter
+
+
 async def async_validate_trigger_config(hass, config) -> ConfigType:
     """Validate trigger config."""
     config = _TRIGGER_SCHEMA(config)
+    compile_data_filter(config)
     return config
 
 
@@ -34,8 +78,14 @@ async def async_attach_trigger(
 ) -> CALLBACK_TYPE:
     """Listen for state changes based on configuration."""
     if DOMAIN in hass.data:
-        lvt_api = hass.data[DOMAIN]
-        lvt_api.add_trigger(config, action, automation_info)
+        lvt_hub = hass.data[DOMAIN]
+        return lvt_hub.add_trigger(
+            config,
+            action,
+            automation_info,
+            compile_speaker_filter(config),
+            compile_data_filter(config),
+        )
 
     @callback
     def async_remove() -> None:
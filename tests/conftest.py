@@ -0,0 +1,15 @@
+"""Import LVT modules as "_lvt" package without running integration __init__
+(it requires Home Assistant)"""
+
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+LVT_DIR = os.path.join(os.path.dirname(__file__), "..", "custom-components", "lvt")
+
+_package = importlib.util.module_from_spec(
+    importlib.machinery.ModuleSpec("_lvt", None, is_package=True)
+)
+_package.__path__ = [LVT_DIR]
+sys.modules.setdefault("_lvt", _package)
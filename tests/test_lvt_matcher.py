@@ -0,0 +1,40 @@
+"""Slot extraction of the local intent matcher (no Home Assistant required)"""
+
+from _lvt.lvt_matcher import LvtIntentMatcher
+
+
+def matcher(*utterances) -> LvtIntentMatcher:
+    return LvtIntentMatcher(
+        [{"Intent": "TestIntent", "Utterance": list(utterances), "Terminals": None}]
+    )
+
+
+def test_wildcard_followed_by_word():
+    assert matcher("x=* b").match("a b") == ("TestIntent", {"x": "a"})
+
+
+def test_dictionary_followed_by_word():
+    assert matcher("на t=<number> минут").match("на пять минут") == (
+        "TestIntent",
+        {"t": "пять"},
+    )
+
+
+def test_multiword_capture_and_list():
+    assert matcher("включи d=[свет, lamp=лампу] в r=* комнате").match(
+        "включи лампу в большой детской комнате"
+    ) == ("TestIntent", {"d": "lamp", "r": "большой детской"})
+
+
+def test_no_match():
+    assert matcher("x=* b").match("a c") is None
+
+
+def test_template_words_tokenized_as_phrase():
+    assert matcher("what's up").match("What's up?") == ("TestIntent", {})
+    assert matcher("кто-нибудь дома").match("кто нибудь дома") == ("TestIntent", {})
+    assert matcher("открой з+амок").match("открой замок") == ("TestIntent", {})
+    assert matcher("x=[what's up, кто-нибудь]").match("кто-нибудь") == (
+        "TestIntent",
+        {"x": "кто-нибудь"},
+    )
@@ -0,0 +1,191 @@
+"""Priority outbox of messages to LVT server"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+from _lvt.lvt_outbox import (  # noqa: E402
+    OUTBOX_TRANSIENT_TTL,
+    OUTBOX_TTL,
+    PRIORITY_AUTHORIZE,
+    LvtOutbox,
+)
+
+
+def say(text: str, importance: int = 1, terminals=("kitchen",)) -> dict:
+    return {
+        "Message": "Say",
+        "Data": {"Say": text, "Importance": importance, "Terminals": list(terminals)},
+    }
+
+
+def status(data: dict) -> dict:
+    return {"Message": "Status", "Data": data}
+
+
+def drain(queue: LvtOutbox) -> list:
+    messages = []
+    while (entry := queue.get_nowait()) is not None:
+        messages.append(entry.message)
+    return messages
+
+
+def test_priority_order():
+    queue = LvtOutbox()
+    queue.put(say("a", 0))
+    queue.put(say("b", 3))
+    queue.put({"Message": "SetIntents", "Data": []})
+    queue.put(say("c", 3))
+    queue.put({"Message": "Authorize", "Data": "password"})
+    assert [m["Message"] for m in drain(queue)] == [
+        "Authorize",
+        "SetIntents",
+        "Say",
+        "Say",
+        "Say",
+    ]
+    queue.put(say("a", 0))
+    queue.put(say("b", 3))
+    queue.put(say("c", 3))
+    assert [m["Data"]["Say"] for m in drain(queue)] == ["b", "c", "a"]
+
+
+def test_coalescing():
+    queue = LvtOutbox()
+    queue.put({"Message": "SetIntents", "Data": [1]})
+    queue.put({"Message": "UpdateIntents", "Data": [2]})
+    queue.put(status({"a": {"Volume": 1}}))
+    queue.put(status({"b": {"Volume": 2}, "a": {"Volume": 3}}))
+    # Chattering to the same terminals is superseded, important messages are not
+    queue.put(say("x", 0))
+    queue.put(say("y", 0))
+    queue.put(say("z", 0, ("hall",)))
+    queue.put(say("p", 2))
+    queue.put(say("q", 2))
+    assert len(queue) == 6
+    messages = drain(queue)
+    assert messages[0] == {"Message": "UpdateIntents", "Data": [2]}
+    assert messages[1]["Data"] == {"a": {"Volume": 3}, "b": {"Volume": 2}}
+    assert [m["Data"]["Say"] for m in messages[2:]] == ["p", "q", "y", "z"]
+
+
+def test_shedding():
+    queue = LvtOutbox(maxsize=3)
+    assert queue.put(say("a", 1))
+    assert queue.put(say("b", 2))
+    assert queue.put(say("c", 3))
+    # Oldest message of the lowest priority is dropped
+    assert queue.put(say("d", 2))
+    assert [m["Data"]["Say"] for m in drain(queue)] == ["c", "b", "d"]
+
+    for text in "abc":
+        queue.put(say(text, 3))
+    # Nothing of lower or equal priority to drop
+    assert not queue.put(say("d", 2))
+    assert len(queue) == 3
+
+
+def test_ttl(monkeypatch):
+    queue = LvtOutbox()
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    queue.put(say("a", 0))
+    queue.put(say("b", 3))
+    queue.put({"Message": "Negotiate", "Data": {"Importance": 3}})
+
+    monkeypatch.setattr(time, "time", lambda: now + OUTBOX_TRANSIENT_TTL + 1)
+    # Dialogs expire sooner than messages of the same importance
+    entry = queue.get_nowait()
+    assert entry.message["Data"]["Say"] == "b"
+    monkeypatch.setattr(time, "time", lambda: now + OUTBOX_TTL[0] + 1)
+    assert queue.get_nowait() is None
+    assert len(queue) == 0
+
+
+def test_requeue():
+    queue = LvtOutbox()
+    queue.put(say("a", 2))
+    queue.put(say("b", 2))
+    entry = queue.get_nowait()
+    queue.requeue(entry)
+    assert [m["Data"]["Say"] for m in drain(queue)] == ["a", "b"]
+
+    # Status of speaker "a" failed to send while status of "b" was queued
+    queue.put(status({"a": 1}))
+    entry = queue.get_nowait()
+    queue.put(status({"b": 2}))
+    queue.requeue(entry)
+    assert drain(queue) == [status({"a": 1, "b": 2})]
+
+    queue.put(status({"a": 1}))
+    entry = queue.get_nowait()
+    queue.put(status({"a": 3}))
+    queue.requeue(entry)
+    assert drain(queue) == [status({"a": 3})]
+
+
+def test_dump_restore(monkeypatch):
+    queue = LvtOutbox()
+    queue.put(say("a", 1))
+    queue.put(say("b", 3))
+    queue.put({"Message": "SetIntents", "Data": []})
+    queue.put({"Message": "Negotiate", "Data": {"Importance": 3}})
+    queue.put({"Message": "Restart", "Data": {}})
+    dump = queue.dump()
+    assert [item["Message"]["Data"]["Say"] for item in dump] == ["b", "a"]
+
+    now = time.time()
+    restored = LvtOutbox()
+    restored.restore(
+        dump
+        + [
+            {"Message": say("expired"), "Expires": now - 1},
+            {"Message": {"Message": "Restart", "Data": {}}, "Expires": now + 60},
+            {"Message": "garbage"},
+        ]
+    )
+    assert [m["Data"]["Say"] for m in drain(restored)] == ["b", "a"]
+
+
+def test_persistent():
+    queue = LvtOutbox()
+    queue.put({"Message": "Negotiate", "Data": {"Importance": 3}})
+    queue.put({"Message": "SetIntents", "Data": []})
+    assert not queue.persistent
+    queue.put(say("a"))
+    assert queue.persistent
+    drain(queue)
+    assert not queue.persistent
+
+
+def test_min_priority_and_remove_request():
+    queue = LvtOutbox()
+    queue.put({"Message": "Negotiate", "Data": {}, "RequestId": "1.1"})
+    queue.put(say("a"))
+    queue.put({"Message": "Authorize", "Data": "password"})
+    queue.min_priority = PRIORITY_AUTHORIZE
+    assert queue.get_nowait().message["Message"] == "Authorize"
+    assert queue.get_nowait() is None
+
+    assert queue.remove_request("1.1")
+    assert not queue.remove_request("1.1")
+    queue.min_priority = 0
+    assert drain(queue) == [say("a")]
+
+
+def test_async_get():
+    async def run():
+        queue = LvtOutbox()
+        queue.min_priority = PRIORITY_AUTHORIZE
+        getter = asyncio.ensure_future(queue.async_get())
+        queue.put(say("a"))
+        await asyncio.sleep(0)
+        assert not getter.done()
+        queue.min_priority = 0
+        entry = await asyncio.wait_for(getter, 1)
+        assert entry.message == say("a")
+
+    asyncio.run(run())
@@ -0,0 +1,79 @@
+"""Utterance template compiler (no Home Assistant required)"""
+
+import pytest
+
+from _lvt.lvt_utterance import (
+    UtteranceDictionary,
+    UtteranceError,
+    UtteranceList,
+    UtteranceWildcard,
+    UtteranceWord,
+    compile_utterance,
+)
+
+
+@pytest.mark.parametrize(
+    "utterance, slots, dictionaries",
+    [
+        ("включи свет в location=<Locations>", {"location"}, {"Locations"}),
+        (
+            "action=[on=включи,off=выключи] свет в location=<Locations>",
+            {"action", "location"},
+            {"Locations"},
+        ),
+        (
+            "включи color=[00FF00=зеленый,0000FF=синий,FFFFFF=яркий,"
+            "404040=приглушенный] свет",
+            {"color"},
+            set(),
+        ),
+        ("Сколько сейчас времени", set(), set()),
+        ("Выключи свет <time>", set(), {"time"}),
+    ],
+)
+def test_readme_examples(utterance, slots, dictionaries):
+    compiled = compile_utterance(utterance)
+    assert compiled.slots == slots
+    assert compiled.dictionaries == dictionaries
+    # Normalized text compiles to the same template
+    assert compile_utterance(compiled.text).nodes == compiled.nodes
+
+
+def test_nodes():
+    compiled = compile_utterance("Включи  d=[свет, lamp=Лампу в зале] ? r=* <time>")
+    assert compiled.nodes == (
+        UtteranceWord("включи"),
+        UtteranceList("d", ((None, ("свет",)), ("lamp", ("лампу", "в", "зале")))),
+        UtteranceWildcard(None, "?"),
+        UtteranceWildcard("r", "*"),
+        UtteranceDictionary(None, "time"),
+    )
+    assert compiled.text == "включи d=[свет,lamp=лампу в зале] ? r=* <time>"
+    assert compiled.vocabulary == {"включи", "свет", "лампу", "в", "зале"}
+
+
+@pytest.mark.parametrize(
+    "utterance, message, pos",
+    [
+        ("", "Empty utterance", 0),
+        ("   ", "Empty utterance", 0),
+        ("= x", 'Unexpected "="', 0),
+        ("a ]", 'Unexpected "]"', 2),
+        ("a > b", 'Unexpected ">"', 2),
+        ("a-b=?", "Invalid variable name", 0),
+        ("x=foo", '"?", "*", "[" or "<" expected after variable name', 2),
+        ("<a-b>", "Invalid dictionary name", 1),
+        ("<abc", '">" expected', 4),
+        ("x=[a=b,a=c]", 'Duplicate value "a"', 10),
+        ("[a", '"," or "]" expected', 2),
+        ("[a b=c]", "Value should precede option words", 3),
+        ("[a,,b]", "Empty list option", 3),
+        ("[]", "Empty list option", 1),
+        ("x=? x=*", 'Duplicate variable "x"', None),
+    ],
+)
+def test_errors(utterance, message, pos):
+    with pytest.raises(UtteranceError) as error:
+        compile_utterance(utterance)
+    assert str(error.value).startswith(message)
+    assert error.value.pos == pos